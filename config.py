@@ -3,6 +3,9 @@ Configuration file for moreStacks Banking Application
 Centralizes all configurable values for easy maintenance and customization
 """
 
+import os
+import sys
+
 # Database Configuration
 DATABASE_PATH = "moreStacks.db"
 
@@ -39,8 +42,16 @@ class SecurityConfig:
     MAX_LOGIN_ATTEMPTS = 5
     LOCKOUT_DURATION_MINUTES = 15
 
-    # bcrypt
-    BCRYPT_ROUNDS = 10  # Number of hashing rounds
+    # Password Hashing
+    # bcrypt work factor (log2 of the number of rounds)
+    BCRYPT_ROUNDS = int(os.getenv("MORESTACKS_BCRYPT_COST", "12"))
+    # Lowest cost ever used for new hashes, whatever BCRYPT_ROUNDS says
+    BCRYPT_MIN_ROUNDS = int(os.getenv("MORESTACKS_BCRYPT_MIN_COST", "10"))
+    # "bcrypt", or "argon2" when argon2-cffi is installed
+    PASSWORD_HASH_SCHEME = os.getenv("MORESTACKS_PASSWORD_HASH", "bcrypt")
+    # Secret key for the fast password-reuse check; kept outside the database.
+    # When unset, reuse is checked against the stored hashes instead
+    PASSWORD_PEPPER = os.getenv("MORESTACKS_PASSWORD_PEPPER", "")
 
     # Session Management (NEW in v2.5)
     SESSION_TIMEOUT_MINUTES = 15  # Auto-logout after inactivity
@@ -63,19 +74,24 @@ class InterestConfig:
 
 
 # Transaction Categories
-TRANSACTION_CATEGORIES = [
-    "Uncategorized",
-    "Food & Dining",
-    "Shopping",
-    "Transportation",
-    "Bills & Utilities",
-    "Entertainment",
-    "Healthcare",
-    "Travel",
-    "Personal",
-    "Transfer",
-    "Other",
-]
+# Interned so category comparisons against recorded transactions can
+# short-circuit on identity
+TRANSACTION_CATEGORIES = tuple(
+    sys.intern(category)
+    for category in (
+        "Uncategorized",
+        "Food & Dining",
+        "Shopping",
+        "Transportation",
+        "Bills & Utilities",
+        "Entertainment",
+        "Healthcare",
+        "Travel",
+        "Personal",
+        "Transfer",
+        "Other",
+    )
+)
 
 
 # GUI Configuration
@@ -96,6 +112,11 @@ class GUIConfig:
     DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
     DATE_FORMAT_SHORT = "%Y-%m-%d"
 
+    # Transaction History
+    HISTORY_MAX = 500  # Transactions kept in memory per account
+    REFRESH_DEBOUNCE_MS = 50  # Coalesce display refreshes within this window
+    STATUS_CLEAR_MS = 3000  # How long transaction status messages stay visible
+
 
 # Export Configuration
 class ExportConfig:
@@ -1,26 +1,1079 @@
+import atexit
 import sqlite3
 import bcrypt
+import csv
+import hashlib
+import hmac
+import json
 import os
+import queue
+import secrets
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, List, Dict, Iterator, Tuple
+from config import SecurityConfig
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # argon2-cffi is optional
+    PasswordHasher = None
+
+# Password hashing settings, resolved once at import
+BCRYPT_ROUNDS = SecurityConfig.BCRYPT_ROUNDS
+BCRYPT_MIN_ROUNDS = SecurityConfig.BCRYPT_MIN_ROUNDS
+USE_ARGON2 = SecurityConfig.PASSWORD_HASH_SCHEME == "argon2" and PasswordHasher
+_ARGON2 = PasswordHasher() if PasswordHasher else None
+PASSWORD_PEPPER = SecurityConfig.PASSWORD_PEPPER.encode("utf-8")
+
+# Account numbers to try before giving up on a run of collisions
+ACCOUNT_NUMBER_ATTEMPTS = 10
+
+# Size of each connection's prepared statement cache (sqlite3 default: 128)
+STATEMENT_CACHE_SIZE = 256
+
+# How long a read waits for a pooled connection before opening an extra one
+POOL_WAIT_TIMEOUT = 1.0  # seconds
+
+# Page cache and memory map sizes per connection. The defaults matter
+# once the database grows past SQLite's 2 MB default cache
+DEFAULT_CACHE_MB = 64
+DEFAULT_MMAP_MB = 256
+
+# Page size for newly created database files (SQLite default: 4096)
+PAGE_SIZE = 8192
+
+# Rows fetched per round trip when streaming query results
+FETCH_BATCH_SIZE = 256
+
+# Expired sessions deleted per transaction by cleanup_expired_sessions
+SESSION_CLEANUP_BATCH = 1000
+
+# Recently read account and user rows, reused for a short time
+ROW_CACHE_SIZE = 1024
+ROW_CACHE_TTL = 2.0  # seconds
+# 2FA flags and password dates change rarely and are invalidated by every
+# method here that writes them, and by commits from other connections, so
+# they can be cached for longer
+AUTH_CACHE_TTL = 30.0  # seconds
+# 2FA last-used timestamps are buffered and written at most this often
+LAST_USED_FLUSH_INTERVAL = 10.0  # seconds
+# Audit log entries are buffered and inserted together: a batch is written
+# once it is this large, by a background timer this long after its first
+# entry, before any audit read, and at close or interpreter exit
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 0.5  # seconds
+
+# Stored in PRAGMA user_version once create_tables has run; bump it
+# whenever create_tables or a migration changes
+SCHEMA_VERSION = 11
+
+# Money columns hold integer cents; values cross the API as float dollars
+MONEY_COLUMNS = {
+    "accounts": ("balance", "credit_limit"),
+    "transactions": ("amount", "balance_after"),
+    "transfers": ("amount",),
+}
+
+USERS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        full_name TEXT NOT NULL,
+        email TEXT,
+        phone TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_login TEXT,
+        failed_login_attempts INTEGER DEFAULT 0,
+        account_locked_until INTEGER,
+        password_changed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        totp_enabled INTEGER DEFAULT 0
+    )
+"""
+ACCOUNTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        account_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        account_number TEXT UNIQUE NOT NULL,
+        account_type TEXT NOT NULL,
+        balance INTEGER NOT NULL DEFAULT 0,
+        interest_rate REAL DEFAULT 0,
+        credit_limit INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'active',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_interest_date TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )
+"""
+TRANSACTIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER NOT NULL,
+        transaction_type TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        category TEXT,
+        description TEXT,
+        balance_after INTEGER NOT NULL,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (account_id) REFERENCES accounts(account_id)
+    )
+"""
+TRANSFERS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        transfer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_account_id INTEGER NOT NULL,
+        to_account_id INTEGER NOT NULL,
+        amount INTEGER NOT NULL,
+        description TEXT,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (from_account_id) REFERENCES accounts(account_id),
+        FOREIGN KEY (to_account_id) REFERENCES accounts(account_id)
+    )
+"""
+# Sessions are only ever looked up by token, so the token is the clustered
+# key. STRICT tables (SQLite 3.37+) reject values of the wrong type
+SESSIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        session_token TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        created_at TEXT NOT NULL,
+        last_activity TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    ) WITHOUT ROWID, STRICT
+"""
+PASSWORD_HISTORY_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        password_hash TEXT NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        reuse_tag BLOB,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    ) STRICT
+"""
+AUDIT_LOGS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        username TEXT,
+        event_type TEXT NOT NULL,
+        event_category TEXT NOT NULL,
+        description TEXT NOT NULL,
+        ip_address TEXT,
+        user_agent TEXT,
+        severity TEXT NOT NULL,
+        metadata TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL
+    ) STRICT
+"""
+TABLE_DDL = {
+    "users": USERS_TABLE_SQL,
+    "accounts": ACCOUNTS_TABLE_SQL,
+    "transactions": TRANSACTIONS_TABLE_SQL,
+    "transfers": TRANSFERS_TABLE_SQL,
+    "sessions": SESSIONS_TABLE_SQL,
+    "password_history": PASSWORD_HISTORY_TABLE_SQL,
+    "audit_logs": AUDIT_LOGS_TABLE_SQL,
+}
+STRICT_TABLES = ("sessions", "password_history", "audit_logs")
+
+# Tables, triggers and indexes outside TABLE_DDL, run as one script by
+# create_tables once the migrations have brought TABLE_DDL tables up to date
+SCHEMA_SQL = """
+    -- TOTP secrets table for Two-Factor Authentication
+    CREATE TABLE IF NOT EXISTS totp_secrets (
+        totp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER UNIQUE NOT NULL,
+        secret_key TEXT NOT NULL,
+        enabled INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_used TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    );
+
+    -- One row per 2FA backup code, stored as a SHA-256 of the normalized code
+    CREATE TABLE IF NOT EXISTS totp_backup_codes (
+        user_id INTEGER NOT NULL,
+        code_hash TEXT NOT NULL,
+        used_at TEXT,
+        PRIMARY KEY (user_id, code_hash)
+    ) WITHOUT ROWID, STRICT;
+
+    -- Indexes for audit log lookups; each filter column is paired with
+    -- created_at so newest-first pages are read in index order. They are
+    -- ascending: a backward scan then also yields log_id (the rowid) in
+    -- descending order, which the keyset tiebreaker relies on
+    DROP INDEX IF EXISTS idx_audit_user_id;
+    DROP INDEX IF EXISTS idx_audit_event_type;
+    DROP INDEX IF EXISTS idx_audit_severity;
+    DROP INDEX IF EXISTS idx_audit_category;
+    DROP INDEX IF EXISTS idx_audit_user_ts;
+    DROP INDEX IF EXISTS idx_audit_type_ts;
+    DROP INDEX IF EXISTS idx_audit_category_ts;
+    DROP INDEX IF EXISTS idx_audit_category_severity_ts;
+    DROP INDEX IF EXISTS idx_audit_severity_ts;
+    CREATE INDEX IF NOT EXISTS idx_audit_user_time ON audit_logs(user_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_audit_type_time ON audit_logs(event_type, created_at);
+    CREATE INDEX IF NOT EXISTS idx_audit_category_time
+    ON audit_logs(event_category, created_at);
+    CREATE INDEX IF NOT EXISTS idx_audit_category_severity_time
+    ON audit_logs(event_category, severity, created_at);
+    CREATE INDEX IF NOT EXISTS idx_audit_severity_time ON audit_logs(severity, created_at);
+    CREATE INDEX IF NOT EXISTS idx_audit_created_at ON audit_logs(created_at);
+
+    -- Running audit log row count, so unfiltered counts skip a full scan
+    CREATE TABLE IF NOT EXISTS audit_log_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_audit_logs_count_insert
+    AFTER INSERT ON audit_logs
+    BEGIN
+        UPDATE audit_log_stats SET total = total + 1 WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_audit_logs_count_delete
+    AFTER DELETE ON audit_logs
+    BEGIN
+        UPDATE audit_log_stats SET total = total - 1 WHERE id = 1;
+    END;
+
+    -- Trigram index over usernames, so substring searches (LIKE '%term%')
+    -- are answered from the index instead of scanning every audit log.
+    -- It stores no text of its own; rows are read back from audit_logs
+    CREATE VIRTUAL TABLE IF NOT EXISTS audit_logs_fts USING fts5(
+        username, content='audit_logs', content_rowid='log_id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_audit_logs_fts_insert
+    AFTER INSERT ON audit_logs
+    BEGIN
+        INSERT INTO audit_logs_fts (rowid, username)
+        VALUES (NEW.log_id, NEW.username);
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_audit_logs_fts_delete
+    AFTER DELETE ON audit_logs
+    BEGIN
+        INSERT INTO audit_logs_fts (audit_logs_fts, rowid, username)
+        VALUES ('delete', OLD.log_id, OLD.username);
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_audit_logs_fts_update
+    AFTER UPDATE OF username ON audit_logs
+    BEGIN
+        INSERT INTO audit_logs_fts (audit_logs_fts, rowid, username)
+        VALUES ('delete', OLD.log_id, OLD.username);
+        INSERT INTO audit_logs_fts (rowid, username)
+        VALUES (NEW.log_id, NEW.username);
+    END;
+
+    -- Running per-account totals, maintained by triggers on transactions
+    CREATE TABLE IF NOT EXISTS account_stats (
+        account_id INTEGER PRIMARY KEY,
+        total_transactions INTEGER NOT NULL DEFAULT 0,
+        total_deposits INTEGER NOT NULL DEFAULT 0,
+        total_withdrawals INTEGER NOT NULL DEFAULT 0,
+        total_transfers_in INTEGER NOT NULL DEFAULT 0,
+        total_transfers_out INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_stats_insert
+    AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO account_stats (
+            account_id, total_transactions, total_deposits,
+            total_withdrawals, total_transfers_in, total_transfers_out
+        )
+        VALUES (
+            NEW.account_id, 1,
+            CASE WHEN NEW.transaction_type = 'Deposit' THEN NEW.amount ELSE 0 END,
+            CASE WHEN NEW.transaction_type = 'Withdrawal' THEN NEW.amount ELSE 0 END,
+            CASE WHEN NEW.transaction_type = 'Transfer In' THEN NEW.amount ELSE 0 END,
+            CASE WHEN NEW.transaction_type = 'Transfer Out' THEN NEW.amount ELSE 0 END
+        )
+        ON CONFLICT(account_id) DO UPDATE SET
+            total_transactions = total_transactions + 1,
+            total_deposits = total_deposits + excluded.total_deposits,
+            total_withdrawals = total_withdrawals + excluded.total_withdrawals,
+            total_transfers_in = total_transfers_in + excluded.total_transfers_in,
+            total_transfers_out = total_transfers_out + excluded.total_transfers_out;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_stats_delete
+    AFTER DELETE ON transactions
+    BEGIN
+        UPDATE account_stats SET
+            total_transactions = total_transactions - 1,
+            total_deposits = total_deposits
+                - CASE WHEN OLD.transaction_type = 'Deposit' THEN OLD.amount ELSE 0 END,
+            total_withdrawals = total_withdrawals
+                - CASE WHEN OLD.transaction_type = 'Withdrawal' THEN OLD.amount ELSE 0 END,
+            total_transfers_in = total_transfers_in
+                - CASE WHEN OLD.transaction_type = 'Transfer In' THEN OLD.amount ELSE 0 END,
+            total_transfers_out = total_transfers_out
+                - CASE WHEN OLD.transaction_type = 'Transfer Out' THEN OLD.amount ELSE 0 END
+        WHERE account_id = OLD.account_id;
+        DELETE FROM account_stats
+        WHERE account_id = OLD.account_id AND total_transactions <= 0;
+    END;
+
+    -- Deleting an account removes its history in the same statement.
+    -- A trigger is used rather than ON DELETE CASCADE because foreign
+    -- key enforcement is off (see DatabaseManager._configure_connection).
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_delete_cascade
+    AFTER DELETE ON accounts
+    BEGIN
+        DELETE FROM account_stats WHERE account_id = OLD.account_id;
+        DELETE FROM transactions WHERE account_id = OLD.account_id;
+        DELETE FROM transfers
+        WHERE from_account_id = OLD.account_id
+           OR to_account_id = OLD.account_id;
+    END;
+
+    -- Indexes for account and transaction lookups
+    CREATE INDEX IF NOT EXISTS idx_accounts_user
+    ON accounts(user_id, status, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_accounts_savings
+    ON accounts(account_type, status, last_interest_date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_account_time
+    ON transactions(account_id, timestamp DESC, transaction_id DESC);
+    CREATE INDEX IF NOT EXISTS idx_transactions_category
+    ON transactions(account_id, category, timestamp)
+    WHERE category IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_transfers_from ON transfers(from_account_id);
+    CREATE INDEX IF NOT EXISTS idx_transfers_to ON transfers(to_account_id);
+
+    -- Indexes for session and password history lookups
+    CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id);
+    CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at);
+    CREATE INDEX IF NOT EXISTS idx_password_history_user
+    ON password_history(user_id, created_at DESC);
+"""
+BACKFILL_ACCOUNT_STATS_SQL = """
+    INSERT INTO account_stats
+    SELECT
+        account_id,
+        COUNT(*),
+        SUM(CASE WHEN transaction_type = 'Deposit' THEN amount ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'Withdrawal' THEN amount ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'Transfer In' THEN amount ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'Transfer Out' THEN amount ELSE 0 END)
+    FROM transactions
+    GROUP BY account_id
+"""
+# Recounted and reindexed whenever create_tables runs, e.g. after a
+# table rebuild dropped the triggers
+REFRESH_AUDIT_LOG_STATS_SQL = """
+    INSERT OR REPLACE INTO audit_log_stats (id, total)
+    SELECT 1, COUNT(*) FROM audit_logs
+"""
+REBUILD_AUDIT_LOGS_FTS_SQL = (
+    "INSERT INTO audit_logs_fts (audit_logs_fts) VALUES ('rebuild')"
+)
+
+# Failed logins before an account is locked, and for how long
+MAX_FAILED_LOGINS = 5
+LOCKOUT_MS = 15 * 60 * 1000
+
+# SQL for hot paths, kept as constants so each call reuses the prepared
+# statement cached by the driver
+SELECT_USER_SQL = (
+    "SELECT user_id, username, full_name, email, phone, created_at, last_login "
+    "FROM users WHERE user_id = ?"
+)
+SELECT_USER_ACCOUNTS_SQL = (
+    "SELECT account_id, account_number, account_type, balance / 100.0 AS balance, "
+    "interest_rate, credit_limit / 100.0 AS credit_limit, status, created_at "
+    "FROM accounts WHERE user_id = ? AND status = 'active' "
+    "ORDER BY created_at DESC"
+)
+SELECT_ACCOUNT_SQL = (
+    "SELECT account_id, user_id, account_number, account_type, "
+    "balance / 100.0 AS balance, interest_rate, "
+    "credit_limit / 100.0 AS credit_limit, status, created_at, last_interest_date "
+    "FROM accounts WHERE account_id = ?"
+)
+INSERT_SESSION_SQL = (
+    "INSERT INTO sessions (user_id, session_token, created_at, last_activity, "
+    "expires_at) VALUES (?, ?, ?, ?, ?)"
+)
+SELECT_SESSION_SQL = (
+    "SELECT user_id, session_token, created_at, last_activity, expires_at "
+    "FROM sessions WHERE session_token = ?"
+)
+UPDATE_SESSION_SQL = (
+    "UPDATE sessions SET last_activity = ?, expires_at = ? WHERE session_token = ?"
+)
+DELETE_SESSION_SQL = "DELETE FROM sessions WHERE session_token = ?"
+INSERT_PASSWORD_HISTORY_SQL = (
+    "INSERT INTO password_history (user_id, password_hash, created_at, reuse_tag) "
+    "VALUES (?, ?, ?, ?)"
+)
+SELECT_PASSWORD_HISTORY_SQL = (
+    "SELECT history_id, user_id, password_hash, created_at, reuse_tag "
+    "FROM password_history WHERE user_id = ? ORDER BY created_at DESC LIMIT ?"
+)
+SELECT_REUSE_CANDIDATES_SQL = (
+    "SELECT password_hash, reuse_tag "
+    "FROM password_history WHERE user_id = ? ORDER BY created_at DESC LIMIT ?"
+)
+SELECT_PASSWORD_CHANGED_SQL = "SELECT password_changed_at FROM users WHERE user_id = ?"
+SELECT_2FA_ENABLED_SQL = (
+    "SELECT EXISTS (SELECT 1 FROM totp_secrets WHERE user_id = ?1 AND enabled = 1) "
+    "OR EXISTS (SELECT 1 FROM users WHERE user_id = ?1 AND totp_enabled = 1)"
+)
+UPSERT_TOTP_SECRET_SQL = (
+    "INSERT INTO totp_secrets (user_id, secret_key, enabled) VALUES (?, ?, 1) "
+    "ON CONFLICT(user_id) DO UPDATE SET secret_key = excluded.secret_key, "
+    "enabled = 1, created_at = CURRENT_TIMESTAMP"
+)
+SELECT_2FA_SECRET_SQL = (
+    "SELECT secret_key FROM totp_secrets WHERE user_id = ? AND enabled = 1"
+)
+INSERT_BACKUP_CODE_SQL = (
+    "INSERT OR IGNORE INTO totp_backup_codes (user_id, code_hash) VALUES (?, ?)"
+)
+INSERT_AUDIT_LOG_SQL = (
+    "INSERT INTO audit_logs (user_id, username, event_type, event_category, "
+    "description, ip_address, user_agent, severity, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Never moves last_used backwards, e.g. past a newer backup code use
+UPDATE_2FA_LAST_USED_SQL = (
+    "UPDATE totp_secrets SET last_used = ?1 "
+    "WHERE user_id = ?2 AND (last_used IS NULL OR last_used < ?1)"
+)
+USE_BACKUP_CODE_SQL = (
+    "UPDATE totp_backup_codes SET used_at = CURRENT_TIMESTAMP "
+    "WHERE user_id = ? AND code_hash = ? AND used_at IS NULL "
+    "AND EXISTS (SELECT 1 FROM totp_secrets WHERE user_id = ? AND enabled = 1)"
+)
+COUNT_BACKUP_CODES_SQL = (
+    "SELECT COUNT(*) FROM totp_backup_codes "
+    "JOIN totp_secrets USING (user_id) "
+    "WHERE user_id = ? AND enabled = 1 AND used_at IS NULL"
+)
+# Audit log columns in select order; rows are zipped against these rather
+# than converted with dict(row), which looks every column up by name
+AUDIT_LOG_COLUMNS = (
+    "log_id",
+    "user_id",
+    "username",
+    "event_type",
+    "event_category",
+    "description",
+    "ip_address",
+    "user_agent",
+    "severity",
+    "metadata",
+    "created_at",
+)
+# Column order of CSV exports
+AUDIT_EXPORT_COLUMNS = (
+    "log_id",
+    "created_at",
+    "user_id",
+    "username",
+    "event_type",
+    "event_category",
+    "severity",
+    "description",
+    "ip_address",
+    "user_agent",
+    "metadata",
+)
+EXPORT_BUFFER_SIZE = 1 << 20  # bytes
+SEARCH_AUDIT_LOGS_SQL = f"SELECT {', '.join(AUDIT_LOG_COLUMNS)} FROM audit_logs"
+# Ordered like idx_audit_category_severity_time, so the grouping reads
+# the index without a sort
+AUDIT_STATS_BY_GROUP_SQL = (
+    "SELECT event_category, severity, COUNT(*) FROM audit_logs "
+    "GROUP BY event_category, severity"
+)
+# ?1 is 24 hours ago and ?2 is 7 days ago; the WHERE clause bounds the scan
+# to the idx_audit_created_at range for the last week
+AUDIT_STATS_RECENT_SQL = (
+    "SELECT COUNT(*) FILTER (WHERE created_at >= ?1), "
+    "COUNT(*), "
+    "COUNT(*) FILTER (WHERE event_type = 'LOGIN_FAILED' AND created_at >= ?1), "
+    "COUNT(*) FILTER (WHERE severity = 'CRITICAL') "
+    "FROM audit_logs WHERE created_at >= ?2"
+)
+# Audit log filters in a fixed order, so each combination of filters maps
+# to one WHERE clause (and one cached statement)
+AUDIT_FILTERS = (
+    ("user_id", "user_id = ?"),
+    (
+        "username",
+        "log_id IN (SELECT rowid FROM audit_logs_fts WHERE username LIKE ?)",
+    ),
+    ("event_type", "event_type = ?"),
+    ("event_category", "event_category = ?"),
+    ("severity", "severity = ?"),
+    ("start_date", "created_at >= ?"),
+    ("end_date", "created_at <= ?"),
+    ("end_before", "created_at < ?"),
+)
+DELETE_EXPIRED_SESSIONS_SQL = (
+    "DELETE FROM sessions WHERE session_token IN (SELECT session_token "
+    "FROM sessions WHERE expires_at < ? ORDER BY expires_at LIMIT ?)"
+)
+INSERT_USER_SQL = (
+    "INSERT INTO users (username, password_hash, full_name, email, phone) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+INSERT_ACCOUNT_SQL = """
+    INSERT INTO accounts (user_id, account_number, account_type,
+                          balance, interest_rate, credit_limit)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(account_number) DO NOTHING
+    RETURNING account_id
+"""
+UPDATE_BALANCE_SQL = "UPDATE accounts SET balance = ? WHERE account_id = ?"
+INSERT_TRANSACTION_SQL = (
+    "INSERT INTO transactions (account_id, transaction_type, amount, category, "
+    "description, balance_after) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+SELECT_TRANSFER_ACCOUNTS_SQL = """
+    SELECT account_id, account_number, balance
+    FROM accounts WHERE account_id IN (?, ?)
+"""
+DEBIT_BALANCE_SQL = """
+    UPDATE accounts SET balance = balance - ?
+    WHERE account_id = ? AND balance >= ?
+"""
+CREDIT_BALANCE_SQL = "UPDATE accounts SET balance = balance + ? WHERE account_id = ?"
+# Clears an expired lockout and returns the effective login state in one
+# statement (RETURNING needs SQLite 3.35+)
+BEGIN_LOGIN_SQL = """
+    UPDATE users
+    SET failed_login_attempts = CASE WHEN account_locked_until < ?1
+            THEN 0 ELSE failed_login_attempts END,
+        account_locked_until = CASE WHEN account_locked_until < ?1
+            THEN NULL ELSE account_locked_until END
+    WHERE username = ?2
+    RETURNING user_id, password_hash, failed_login_attempts, account_locked_until
+"""
+RECORD_LOGIN_SQL = """
+    UPDATE users
+    SET failed_login_attempts = ?, account_locked_until = ?,
+        last_login = COALESCE(?, last_login)
+    WHERE user_id = ?
+"""
+APPLY_INTEREST_SQL = """
+    UPDATE accounts SET balance = balance + ?, last_interest_date = ?
+    WHERE account_id = ?
+"""
+INSERT_INTEREST_TRANSACTION_SQL = """
+    INSERT INTO transactions (account_id, transaction_type, amount,
+                              category, description, balance_after)
+    SELECT account_id, 'Interest', ?, 'Interest', 'Interest', balance
+    FROM accounts WHERE account_id = ?
+"""
+INSERT_TRANSFER_SQL = """
+    INSERT INTO transfers (from_account_id, to_account_id, amount, description)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Recently verified (password, hash) pairs, keyed by an HMAC under a
+# per-process random pepper so the plain password is never stored
+_VERIFY_PEPPER = secrets.token_bytes(32)
+_VERIFY_CACHE_SIZE = 2048
+_VERIFY_CACHE_TTL = 300.0  # seconds
+_verified_keys = OrderedDict()
+_verified_lock = threading.Lock()
+
+# Worker processes for password hashing, started on first use
+_HASH_POOL = None
+_HASH_POOL_LOCK = threading.Lock()
+
+# Open managers, so buffered audit entries can be written at exit
+_OPEN_MANAGERS = weakref.WeakSet()
+
+
+def _now_iso() -> str:
+    """Current local time as an ISO 8601 string."""
+    return datetime.now().isoformat()
+
+
+def _to_cents(amount: float) -> int:
+    """Convert a dollar amount to integer cents."""
+    return int(round(amount * 100))
+
+
+def _hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password with the configured scheme (see hash_password)."""
+    if USE_ARGON2:
+        return _ARGON2.hash(password)
+
+    # Generate salt and hash password
+    salt = bcrypt.gensalt(rounds=_bcrypt_target(rounds))
+    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
+    return hashed.decode("utf-8")
+
+
+def _bcrypt_target(rounds: Optional[int] = None) -> int:
+    """bcrypt cost for new hashes, never below BCRYPT_MIN_ROUNDS."""
+    return max(rounds or BCRYPT_ROUNDS, BCRYPT_MIN_ROUNDS)
+
+
+def _bcrypt_cost(hashed_password: str) -> Optional[int]:
+    """Read the cost from a $2b$<cost>$... bcrypt hash; None if malformed."""
+    cost = hashed_password[4:6]
+    return int(cost) if cost.isdigit() and hashed_password[6:7] == "$" else None
+
+
+def _reuse_tag(password: str) -> Optional[bytes]:
+    """Keyed digest of a password for reuse checks; None without a pepper."""
+    if not PASSWORD_PEPPER:
+        return None
+    return hmac.new(PASSWORD_PEPPER, password.encode("utf-8"), "sha256").digest()
+
+
+@lru_cache(maxsize=2 ** len(AUDIT_FILTERS))
+def _audit_clauses(mask: int) -> Tuple[str, ...]:
+    """WHERE conditions for the audit filters selected by a bitmask."""
+    return tuple(
+        clause for i, (_, clause) in enumerate(AUDIT_FILTERS) if mask & (1 << i)
+    )
+
+
+def _day_after(end_date: str) -> Optional[str]:
+    """
+    Exclusive upper bound for an end date given as a bare day.
+
+    "2024-05-01" means the whole day, but created_at values on that day
+    sort after it, so the range is closed with "< 2024-05-02" instead.
+    Full timestamps are returned as None and compared inclusively.
+    """
+    if len(end_date) != 10:
+        return None
+    return (datetime.fromisoformat(end_date) + timedelta(days=1)).date().isoformat()
+
+
+def _audit_filter(filters: Dict) -> Tuple[Tuple[str, ...], List]:
+    """Build the WHERE conditions and parameters for audit log filters."""
+    end_date = filters.get("end_date")
+    day_after = _day_after(end_date) if end_date else None
+    if day_after:
+        filters = {**filters, "end_date": None, "end_before": day_after}
+
+    mask = 0
+    params = []
+    for i, (key, _) in enumerate(AUDIT_FILTERS):
+        value = filters.get(key)
+        if value:
+            mask |= 1 << i
+            params.append(f"%{value}%" if key == "username" else value)
+    return _audit_clauses(mask), params
+
+
+def _backup_code_hash(code: str) -> str:
+    """Hash a 2FA backup code, ignoring case, spaces and dashes."""
+    normalized = code.replace(" ", "").replace("-", "").upper()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash (see verify_password)."""
+    try:
+        if hashed_password.startswith("$argon2"):
+            if not _ARGON2:
+                return False
+            try:
+                return _ARGON2.verify(hashed_password, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def _verify_cache_key(password: str, hashed_password: str) -> bytes:
+    """Derive the verification cache key for a password and hash."""
+    message = password.encode("utf-8") + b"\0" + hashed_password.encode("utf-8")
+    return hmac.new(_VERIFY_PEPPER, message, hashlib.sha256).digest()
+
+
+def _verify_password_cached(password: str, hashed_password: str) -> bool:
+    """
+    Verify a password, remembering successful verifications.
+
+    Only matches are cached, so a wrong password always pays the full
+    hashing cost. The stored hash is part of the key, so changing a
+    password invalidates its entries; entries also expire after
+    _VERIFY_CACHE_TTL seconds.
+    """
+    key = _verify_cache_key(password, hashed_password)
+    now = time.monotonic()
+    with _verified_lock:
+        expires_at = _verified_keys.get(key)
+        if expires_at is not None:
+            if expires_at > now:
+                _verified_keys.move_to_end(key)
+                return True
+            del _verified_keys[key]
+
+    if not _verify_password(password, hashed_password):
+        return False
+
+    with _verified_lock:
+        _verified_keys[key] = now + _VERIFY_CACHE_TTL
+        _verified_keys.move_to_end(key)
+        if len(_verified_keys) > _VERIFY_CACHE_SIZE:
+            _verified_keys.popitem(last=False)
+    return True
+
+
+@lru_cache(maxsize=8)
+def _dummy_hash(rounds: int) -> str:
+    """
+    Hash checked for unknown usernames so they cost as much as real ones.
+
+    Made with the same bcrypt cost as the caller's real hashes, since a
+    different cost would make unknown usernames answer faster or slower.
+    """
+    return _hash_password(secrets.token_hex(16), rounds)
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    """Get the shared password hashing process pool, starting it if needed."""
+    global _HASH_POOL
+    with _HASH_POOL_LOCK:
+        if _HASH_POOL is None:
+            _HASH_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _HASH_POOL
+
+
+@atexit.register
+def _flush_open_managers():
+    """Write audit entries still buffered by any open DatabaseManager."""
+    for db in list(_OPEN_MANAGERS):
+        if db.conn:
+            db.flush_audit_logs()
+
+
+class _ConnectionPool:
+    """
+    Small LIFO pool of SQLite connections.
+
+    The most recently returned connection is handed out first, so hot
+    connections keep their page cache warm. At most max_size connections
+    are kept; further callers wait up to timeout seconds for one to be
+    returned, then get an extra connection that is closed after use. A
+    caller that never returns its connection (such as an unfinished row
+    generator) therefore slows the pool down instead of deadlocking it.
+    """
+
+    def __init__(
+        self, factory, max_size: int = 8, timeout: float = POOL_WAIT_TIMEOUT
+    ):
+        self._factory = factory
+        self._max_size = max_size
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connection for the duration of a with block."""
+        conn, pooled = self._checkout()
+        try:
+            yield conn
+        finally:
+            if self._closed or not pooled:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def _checkout(self) -> Tuple[sqlite3.Connection, bool]:
+        """
+        Take an idle connection, opening a new one while under the cap.
+
+        Returns:
+            Tuple of (connection, whether it belongs to the pool)
+        """
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self._max_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self._factory(), True
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self._timeout), True
+        except queue.Empty:
+            return self._factory(), False
+
+    def close(self):
+        """Close every idle connection; borrowed ones close when returned."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class _TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time.
+
+    Used to skip repeated primary key lookups; writers pop the keys they
+    change, and the TTL bounds staleness from writes made elsewhere.
+    Values are shared between callers, so only immutable values (such as
+    sqlite3.Row objects or strings) should be stored; None means "missing".
+    """
+
+    def __init__(self, max_size: int = ROW_CACHE_SIZE, ttl: float = ROW_CACHE_TTL):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, *keys):
+        """Drop the given keys."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
 
 
 class DatabaseManager:
     """Manages all database operations for the moreStacks banking application."""
 
-    def __init__(self, db_path: str = "moreStacks.db"):
-        """Initialize database connection and create tables if they don't exist."""
+    def __init__(
+        self,
+        db_path: str = "moreStacks.db",
+        pool_size: int = 8,
+        cache_mb: int = DEFAULT_CACHE_MB,
+        mmap_mb: int = DEFAULT_MMAP_MB,
+        bcrypt_cost: Optional[int] = None,
+    ):
+        """
+        Initialize database connection and create tables if they don't exist.
+
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Maximum number of pooled read-only connections
+            cache_mb: Page cache size per connection, in MB
+            mmap_mb: Memory-mapped I/O size per connection, in MB (0 disables)
+            bcrypt_cost: bcrypt cost for new hashes; stored hashes with a
+                different cost are upgraded on the next successful login
+                (default: SecurityConfig.BCRYPT_ROUNDS)
+        """
         self.db_path = db_path
+        self.pool_size = pool_size
+        self.cache_mb = cache_mb
+        self.mmap_mb = mmap_mb
+        self.bcrypt_cost = bcrypt_cost or BCRYPT_ROUNDS
+        # Built now so the first unknown-user login pays for one hash, not two
+        _dummy_hash(self.bcrypt_cost)
         self.conn = None
         self.cursor = None
+        self._pool = None
+        self._tx_depth = 0
+        self._account_cache = _TTLCache()
+        self._user_cache = _TTLCache()
+        self._auth_cache = _TTLCache(ttl=AUTH_CACHE_TTL)
+        self._data_version = None
+        self._pending_last_used = {}
+        self._last_used_flushed = time.monotonic()
+        self._last_used_lock = threading.Lock()
+        self._pending_audit = []
+        self._audit_lock = threading.Lock()
+        self._audit_timer = None
+        self._audit_conn = None
+        self._audit_write_lock = threading.Lock()
         self.connect()
-        self.create_tables()
+        _OPEN_MANAGERS.add(self)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.create_tables()
 
     def connect(self):
         """Establish database connection."""
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(
+            self.db_path, cached_statements=STATEMENT_CACHE_SIZE
+        )
         self.conn.row_factory = sqlite3.Row  # Access columns by name
         self.cursor = self.conn.cursor()
+        self.cursor.arraysize = FETCH_BATCH_SIZE  # default fetchmany() size
+        self._conn_thread = threading.get_ident()
+        self._configure_connection(self.conn)
+
+        # Read queries use pooled connections; an in-memory database only
+        # exists on the connection that created it, so it cannot be pooled
+        if self.db_path != ":memory:":
+            self._pool = _ConnectionPool(
+                self._open_pooled_connection, max_size=self.pool_size
+            )
+
+    def _open_pooled_connection(self) -> sqlite3.Connection:
+        """
+        Open an additional read-only connection for the read pool.
+
+        Writes stay on the main connection; opening pooled connections with
+        mode=ro makes an accidental write through the pool fail loudly.
+        Pooled connections are created with check_same_thread=False because
+        any thread may borrow one; the pool lends each to one thread at a
+        time. The main connection keeps sqlite3's same-thread check.
+        """
+        conn = sqlite3.connect(
+            f"{Path(self.db_path).resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn)
+        return conn
+
+    def _in_write_transaction(self) -> bool:
+        """True if this thread has uncommitted writes on the main connection."""
+        return threading.get_ident() == self._conn_thread and bool(
+            self._tx_depth or self.conn.in_transaction
+        )
+
+    @contextmanager
+    def _read_connection(self):
+        """
+        Borrow a connection for read-only queries.
+
+        While a transaction is open on the main connection, reads from its
+        thread use that connection too, so they see the uncommitted writes.
+        """
+        if self._pool is None or self._in_write_transaction():
+            yield self.conn
+        else:
+            with self._pool.acquire() as conn:
+                yield conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several writes into one transaction and one commit.
+
+        Methods called inside the block skip their own commits, so the
+        block commits once on success and rolls back on error. Nested
+        blocks become savepoints of the outer transaction.
+        """
+        depth = self._tx_depth
+        if depth:
+            self.cursor.execute(f"SAVEPOINT tx_{depth}")
+        elif not self.conn.in_transaction:
+            self.cursor.execute("BEGIN IMMEDIATE")
+
+        self._tx_depth += 1
+        try:
+            yield
+        except BaseException:
+            if depth:
+                self.cursor.execute(f"ROLLBACK TO tx_{depth}")
+                self.cursor.execute(f"RELEASE tx_{depth}")
+            else:
+                self.conn.rollback()
+            raise
+        else:
+            if depth:
+                self.cursor.execute(f"RELEASE tx_{depth}")
+            else:
+                self.conn.commit()
+        finally:
+            self._tx_depth -= 1
+
+    def _commit(self):
+        """Commit, unless an enclosing transaction() block owns the commit."""
+        if not self._tx_depth:
+            self.conn.commit()
+
+    def _rollback(self):
+        """Roll back, unless an enclosing transaction() block decides."""
+        if not self._tx_depth:
+            self.conn.rollback()
+
+    def _iter_rows(self, query: str, params=()) -> Iterator[sqlite3.Row]:
+        """
+        Run a read query and yield each row.
+
+        Rows are fetched in batches of FETCH_BATCH_SIZE, so only one batch
+        is held in memory at a time. The pooled connection is returned once
+        the generator is exhausted or closed.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.execute(query, params)
+            cursor.arraysize = FETCH_BATCH_SIZE
+            while chunk := cursor.fetchmany():
+                yield from chunk
+
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """
+        Apply performance and integrity PRAGMAs to a connection.
+
+        WAL lets readers run alongside a writer and, with synchronous=NORMAL,
+        commits no longer fsync the main database file. The tradeoff is that
+        a power loss can drop the last commits before a checkpoint; the
+        database itself stays consistent. In-memory databases do not support
+        WAL and keep their default journal.
+
+        page_size only takes effect on a brand new file, so it is set before
+        WAL initializes the database and is ignored afterwards.
+
+        Foreign key enforcement stays off: audit log entries may reference
+        user ids that were never created (e.g. failed logins).
+        """
+        if self.db_path != ":memory:":
+            conn.execute(f"PRAGMA page_size={PAGE_SIZE}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={self.mmap_mb * 1024 * 1024}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size={-self.cache_mb * 1024}")  # in KiB
+        conn.execute("PRAGMA busy_timeout=5000")
 
     def get_connection(self):
         """
@@ -33,170 +1086,167 @@ class DatabaseManager:
 
     def create_tables(self):
         """Create all necessary database tables."""
-        # Users table
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                email TEXT,
-                phone TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                last_login TEXT,
-                failed_login_attempts INTEGER DEFAULT 0,
-                account_locked_until TEXT
-            )
-        """
+        # Users, accounts, transactions, transfers, sessions, password
+        # history and audit log tables
+        self.cursor.executescript(
+            ";".join(ddl.format(table=table) for table, ddl in TABLE_DDL.items())
         )
+        self._migrate_money_to_cents()
+        self._migrate_lockout_to_epoch_ms()
+        self._migrate_to_strict_tables()
 
-        # Accounts table
+        # Running per-account totals are backfilled when first created
         self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS accounts (
-                account_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                account_number TEXT UNIQUE NOT NULL,
-                account_type TEXT NOT NULL,
-                balance REAL NOT NULL DEFAULT 0,
-                interest_rate REAL DEFAULT 0,
-                credit_limit REAL DEFAULT 0,
-                status TEXT DEFAULT 'active',
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                last_interest_date TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'account_stats'"
         )
+        backfill_stats = self.cursor.fetchone() is None
 
-        # Transactions table
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS transactions (
-                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                account_id INTEGER NOT NULL,
-                transaction_type TEXT NOT NULL,
-                amount REAL NOT NULL,
-                category TEXT,
-                description TEXT,
-                balance_after REAL NOT NULL,
-                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (account_id) REFERENCES accounts(account_id)
-            )
-        """
-        )
+        # TOTP secrets, account totals, triggers and indexes in one call
+        self.cursor.executescript(SCHEMA_SQL)
+        self._migrate_backup_codes_to_table()
+        if backfill_stats:
+            self.cursor.execute(BACKFILL_ACCOUNT_STATS_SQL)
+        self.cursor.execute(REFRESH_AUDIT_LOG_STATS_SQL)
+        self.cursor.execute(REBUILD_AUDIT_LOGS_FTS_SQL)
 
-        # Transfers table
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS transfers (
-                transfer_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_account_id INTEGER NOT NULL,
-                to_account_id INTEGER NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT,
-                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (from_account_id) REFERENCES accounts(account_id),
-                FOREIGN KEY (to_account_id) REFERENCES accounts(account_id)
-            )
-        """
-        )
+        self._commit()
+        self._migrate_existing_tables()
+        self._analyze_if_needed()
+
+        # PRAGMA values cannot be bound as parameters
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
-        # Sessions table for session timeout management
+    def _analyze_if_needed(self):
+        """Gather planner statistics once, the first time the database is opened."""
         self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                session_token TEXT UNIQUE NOT NULL,
-                created_at TEXT NOT NULL,
-                last_activity TEXT NOT NULL,
-                expires_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
         )
+        if not self.cursor.fetchone():
+            self.cursor.execute("ANALYZE")
+            self._commit()
 
-        # Password history table for password expiration management
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS password_history (
-                history_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
+    def _column_types(self, table: str) -> Dict[str, str]:
+        """Map each column of a table to its declared type."""
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        return {column[1]: column[2].upper() for column in self.cursor.fetchall()}
+
+    def _rebuild_table(self, table: str, columns: List[str], conversions: Dict):
         """
-        )
+        Copy a table into a fresh one built from TABLE_DDL and swap it in.
 
-        # TOTP secrets table for Two-Factor Authentication
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS totp_secrets (
-                totp_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER UNIQUE NOT NULL,
-                secret_key TEXT NOT NULL,
-                backup_codes TEXT,
-                enabled INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                last_used TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-            )
+        SQLite cannot change a column's type in place. Must be called inside
+        a transaction; indexes and triggers on the table are dropped and are
+        recreated by create_tables afterwards.
+
+        Args:
+            table: Table to rebuild
+            columns: Existing columns to copy
+            conversions: SQL expression to copy in place of a column, by name
         """
+        self.cursor.execute(TABLE_DDL[table].format(table=f"{table}_new"))
+        select_list = ", ".join(conversions.get(c, c) for c in columns)
+        self.cursor.execute(
+            f"INSERT INTO {table}_new ({', '.join(columns)}) "
+            f"SELECT {select_list} FROM {table}"
         )
+        self.cursor.execute(f"DROP TABLE {table}")
+        self.cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+    def _migrate_money_to_cents(self):
+        """Convert REAL dollar columns from older databases to INTEGER cents."""
+        stale = []
+        for table, money in MONEY_COLUMNS.items():
+            types = self._column_types(table)
+            if types.get(money[0]) == "REAL":
+                stale.append((table, list(types)))
+
+        if not stale:
+            return
+
+        with self.transaction():
+            for table, columns in stale:
+                self._rebuild_table(
+                    table,
+                    columns,
+                    {
+                        c: f"CAST(ROUND({c} * 100) AS INTEGER)"
+                        for c in MONEY_COLUMNS[table]
+                    },
+                )
 
-        # Audit logs table for Security Audit Trail
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS audit_logs (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                username TEXT,
-                event_type TEXT NOT NULL,
-                event_category TEXT NOT NULL,
-                description TEXT NOT NULL,
-                ip_address TEXT,
-                user_agent TEXT,
-                severity TEXT NOT NULL,
-                metadata TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL
+            # Totals were summed in dollars; rebuild them from the new rows
+            self.cursor.execute("DROP TABLE IF EXISTS account_stats")
+
+    def _migrate_lockout_to_epoch_ms(self):
+        """Convert ISO text lockout times from older databases to epoch ms."""
+        types = self._column_types("users")
+        if types.get("account_locked_until") != "TEXT":
+            return
+
+        # Stored values are naive local times, or epoch ms already when the
+        # column was added as TEXT by an older _migrate_existing_tables
+        with self.transaction():
+            self._rebuild_table(
+                "users",
+                list(types),
+                {
+                    "account_locked_until": "CASE WHEN account_locked_until "
+                    "NOT GLOB '*[^0-9]*' THEN CAST(account_locked_until AS INTEGER) "
+                    "ELSE CAST(strftime('%s', account_locked_until, 'utc') "
+                    "AS INTEGER) * 1000 END"
+                },
             )
-        """
-        )
 
-        # Create indexes for audit logs performance
+    def _migrate_to_strict_tables(self):
+        """Rebuild session, password history and audit tables as STRICT."""
+        stale = []
+        for table in STRICT_TABLES:
+            self.cursor.execute(f"PRAGMA table_list({table})")
+            if not self.cursor.fetchone()["strict"]:
+                stale.append(table)
+
+        if not stale:
+            return
+
+        with self.transaction():
+            for table in stale:
+                # Sessions are keyed by token now; session_id is dropped
+                columns = [c for c in self._column_types(table) if c != "session_id"]
+                self._rebuild_table(table, columns, {})
+
+    def _migrate_backup_codes_to_table(self):
+        """Move JSON backup code lists from totp_secrets into totp_backup_codes."""
+        if "backup_codes" not in self._column_types("totp_secrets"):
+            return
+
         self.cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_audit_user_id ON audit_logs(user_id)
-        """
+            "SELECT user_id, backup_codes FROM totp_secrets "
+            "WHERE backup_codes IS NOT NULL"
         )
-        self.cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_audit_event_type ON audit_logs(event_type)
+        rows = [
+            (user_id, _backup_code_hash(code))
+            for user_id, codes in self.cursor.fetchall()
+            for code in json.loads(codes)
+        ]
+        with self.transaction():
+            self.cursor.executemany(INSERT_BACKUP_CODE_SQL, rows)
+            self.cursor.execute("ALTER TABLE totp_secrets DROP COLUMN backup_codes")
+
+    def _store_backup_codes(self, user_id: int, backup_codes: List[str]):
         """
-        )
-        self.cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_audit_severity ON audit_logs(severity)
+        Replace a user's backup codes with hashes of the given codes.
+
+        Callers run this inside transaction(), so the delete and the bulk
+        insert commit (or roll back) together.
         """
-        )
         self.cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_audit_created_at ON audit_logs(created_at)
-        """
+            "DELETE FROM totp_backup_codes WHERE user_id = ?", (user_id,)
         )
-        self.cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_audit_category ON audit_logs(event_category)
-        """
+        self.cursor.executemany(
+            INSERT_BACKUP_CODE_SQL,
+            [(user_id, _backup_code_hash(code)) for code in backup_codes],
         )
 
-        self.conn.commit()
-        self._migrate_existing_tables()
-
     def _migrate_existing_tables(self):
         """Add new columns to existing tables if they don't exist."""
         try:
@@ -214,7 +1264,7 @@ class DatabaseManager:
             if "account_locked_until" not in columns:
                 self.cursor.execute(
                     """
-                    ALTER TABLE users ADD COLUMN account_locked_until TEXT
+                    ALTER TABLE users ADD COLUMN account_locked_until INTEGER
                 """
                 )
 
@@ -243,32 +1293,47 @@ class DatabaseManager:
                 """
                 )
 
-            self.conn.commit()
+            # Check if reuse_tag column exists in password_history table
+            self.cursor.execute("PRAGMA table_info(password_history)")
+            columns = [column[1] for column in self.cursor.fetchall()]
+
+            if "reuse_tag" not in columns:
+                self.cursor.execute(
+                    """
+                    ALTER TABLE password_history ADD COLUMN reuse_tag BLOB
+                """
+                )
+
+            self._commit()
         except Exception as e:
             # Columns already exist or other error
             pass
 
     @staticmethod
-    def hash_password(password: str) -> str:
+    def hash_password(password: str, rounds: Optional[int] = None) -> str:
         """
-        Hash a password using bcrypt.
+        Hash a password using the configured scheme.
+
+        bcrypt is used by default with SecurityConfig.BCRYPT_ROUNDS; argon2
+        is used instead when configured and argon2-cffi is installed.
 
         Args:
             password: Plain text password
+            rounds: bcrypt cost to use instead of SecurityConfig.BCRYPT_ROUNDS
 
         Returns:
             Hashed password as a string
         """
-        # Generate salt and hash password
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
-        return hashed.decode("utf-8")
+        return _hash_password(password, rounds)
 
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
         """
         Verify a password against a hashed password.
 
+        The scheme is detected from the hash prefix, so bcrypt and argon2
+        hashes can both be verified regardless of the configured scheme.
+
         Args:
             password: Plain text password to verify
             hashed_password: Hashed password to verify against
@@ -276,10 +1341,88 @@ class DatabaseManager:
         Returns:
             True if password matches, False otherwise
         """
+        return _verify_password_cached(password, hashed_password)
+
+    @staticmethod
+    def hash_password_async(password: str, rounds: Optional[int] = None) -> Future:
+        """
+        Hash a password in a worker process.
+
+        Args:
+            password: Plain text password
+            rounds: bcrypt cost to use instead of SecurityConfig.BCRYPT_ROUNDS
+
+        Returns:
+            Future resolving to the hashed password string
+        """
+        return _get_hash_pool().submit(_hash_password, password, rounds)
+
+    @staticmethod
+    def verify_password_async(password: str, hashed_password: str) -> Future:
+        """
+        Verify a password in a worker process.
+
+        Args:
+            password: Plain text password to verify
+            hashed_password: Hashed password to verify against
+
+        Returns:
+            Future resolving to True if the password matches
+        """
+        return _get_hash_pool().submit(_verify_password, password, hashed_password)
+
+    @staticmethod
+    def password_needs_rehash(
+        hashed_password: str, rounds: Optional[int] = None
+    ) -> bool:
+        """
+        Check whether a stored hash was made with outdated settings.
+
+        A bcrypt hash with a higher cost than the target is kept, so a
+        lower setting never weakens existing hashes.
+
+        Args:
+            hashed_password: Stored password hash
+            rounds: Target bcrypt cost instead of SecurityConfig.BCRYPT_ROUNDS
+
+        Returns:
+            True if the hash uses another scheme or a lower cost than configured
+        """
+        if hashed_password.startswith("$argon2"):
+            return not USE_ARGON2 or _ARGON2.check_needs_rehash(hashed_password)
+        if USE_ARGON2:
+            return True
+        cost = _bcrypt_cost(hashed_password)
+        return cost is None or cost < _bcrypt_target(rounds)
+
+    def rehash_if_needed(
+        self, user_id: int, password: str, password_hash: str
+    ) -> bool:
+        """
+        Upgrade a user's stored hash to the configured scheme and cost.
+
+        Must only be called after the password has been verified.
+
+        Args:
+            user_id: ID of the user
+            password: Verified plain text password
+            password_hash: Currently stored hash
+
+        Returns:
+            True if the hash was upgraded, False otherwise
+        """
+        if not self.password_needs_rehash(password_hash, self.bcrypt_cost):
+            return False
         try:
-            return bcrypt.checkpw(
-                password.encode("utf-8"), hashed_password.encode("utf-8")
+            new_hash = self.hash_password(password, self.bcrypt_cost)
+            # Only replace the hash that was verified, not a newer one
+            self.cursor.execute(
+                "UPDATE users SET password_hash = ? "
+                "WHERE user_id = ? AND password_hash = ?",
+                (new_hash, user_id, password_hash),
             )
+            self._commit()
+            return self.cursor.rowcount == 1
         except Exception:
             return False
 
@@ -293,15 +1436,11 @@ class DatabaseManager:
     ) -> Optional[int]:
         """Create a new user account."""
         try:
-            password_hash = self.hash_password(password)
+            password_hash = self.hash_password(password, self.bcrypt_cost)
             self.cursor.execute(
-                """
-                INSERT INTO users (username, password_hash, full_name, email, phone)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (username, password_hash, full_name, email, phone),
+                INSERT_USER_SQL, (username, password_hash, full_name, email, phone)
             )
-            self.conn.commit()
+            self._commit()
             return self.cursor.lastrowid
         except sqlite3.IntegrityError:
             return None  # Username already exists
@@ -318,82 +1457,53 @@ class DatabaseManager:
         Returns:
             user_id if authentication successful, None otherwise
         """
-        # Get user data including lockout information
-        self.cursor.execute(
-            """
-            SELECT user_id, password_hash, failed_login_attempts, account_locked_until
-            FROM users
-            WHERE username = ?
-        """,
-            (username,),
-        )
-        result = self.cursor.fetchone()
+        now_ms = int(time.time() * 1000)
+
+        # Get user data, clearing an expired lockout in the same statement
+        with self.transaction():
+            self.cursor.execute(BEGIN_LOGIN_SQL, (now_ms, username))
+            result = self.cursor.fetchone()
 
         if not result:
-            return None  # User not found
+            # User not found; still pay for a hash check so the response
+            # time does not reveal whether the username exists
+            _verify_password(password, _dummy_hash(self.bcrypt_cost))
+            return None
 
         user_id, password_hash, failed_attempts, locked_until = result
 
         # Check if account is locked
         if locked_until:
-            lockout_time = datetime.fromisoformat(locked_until)
-            if datetime.now() < lockout_time:
-                # Account is still locked
-                return None
-            else:
-                # Lockout period expired, reset counters
-                self.cursor.execute(
-                    """
-                    UPDATE users
-                    SET failed_login_attempts = 0, account_locked_until = NULL
-                    WHERE user_id = ?
-                """,
-                    (user_id,),
-                )
-                self.conn.commit()
-                failed_attempts = 0
+            # Account is still locked; match the cost of a real check so
+            # timing does not reveal the lockout
+            _verify_password(password, _dummy_hash(self.bcrypt_cost))
+            return None
 
-        # Verify password using bcrypt
-        if self.verify_password(password, password_hash):
-            # Successful login - reset failed attempts and update last login
-            self.cursor.execute(
-                """
-                UPDATE users
-                SET last_login = ?, failed_login_attempts = 0, account_locked_until = NULL
-                WHERE user_id = ?
-            """,
-                (datetime.now().isoformat(), user_id),
-            )
-            self.conn.commit()
-            return user_id
-        else:
-            # Failed login - increment counter
-            failed_attempts += 1
+        # Verify password using bcrypt, before taking the write lock
+        authenticated = self.verify_password(password, password_hash)
 
-            if failed_attempts >= 5:
-                # Lock account for 15 minutes
-                lockout_until = datetime.now() + timedelta(minutes=15)
-                self.cursor.execute(
-                    """
-                    UPDATE users
-                    SET failed_login_attempts = ?, account_locked_until = ?
-                    WHERE user_id = ?
-                """,
-                    (failed_attempts, lockout_until.isoformat(), user_id),
-                )
+        # One commit per attempt, whatever the outcome
+        with self.transaction():
+            if authenticated:
+                # Successful login - reset failed attempts and update last login
+                params = (0, None, _now_iso(), user_id)
             else:
-                # Just increment failed attempts
-                self.cursor.execute(
-                    """
-                    UPDATE users
-                    SET failed_login_attempts = ?
-                    WHERE user_id = ?
-                """,
-                    (failed_attempts, user_id),
-                )
+                # Failed login - increment counter, locking for 15 minutes at
+                # the limit
+                failed_attempts += 1
+                locked_until = None
+                if failed_attempts >= MAX_FAILED_LOGINS:
+                    locked_until = now_ms + LOCKOUT_MS
+                params = (failed_attempts, locked_until, None, user_id)
 
-            self.conn.commit()
+            self.cursor.execute(RECORD_LOGIN_SQL, params)
+
+        if not authenticated:
             return None
+        # Rehash after the commit so bcrypt does not run under the write lock
+        self.rehash_if_needed(user_id, password, password_hash)
+        self._user_cache.pop(user_id)
+        return user_id
 
     def is_account_locked(self, username: str) -> Tuple[bool, Optional[datetime]]:
         """
@@ -405,41 +1515,35 @@ class DatabaseManager:
         Returns:
             Tuple of (is_locked, unlock_time)
         """
+        # Only an active lock comes back; expired and missing ones are NULL
         self.cursor.execute(
             """
-            SELECT account_locked_until, failed_login_attempts
+            SELECT MAX(account_locked_until)
             FROM users
-            WHERE username = ?
+            WHERE username = ? AND account_locked_until > ?
         """,
-            (username,),
+            (username, int(time.time() * 1000)),
         )
-        result = self.cursor.fetchone()
+        locked_until = self.cursor.fetchone()[0]
 
-        if not result:
+        if locked_until is None:
             return False, None
+        return True, datetime.fromtimestamp(locked_until / 1000)
 
-        locked_until, failed_attempts = result
-
-        if not locked_until:
-            return False, None
+    def get_user_info(self, user_id: int) -> Optional[sqlite3.Row]:
+        """Get user information."""
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            return cached
 
-        lockout_time = datetime.fromisoformat(locked_until)
-        if datetime.now() < lockout_time:
-            return True, lockout_time
+        with self._read_connection() as conn:
+            cursor = conn.execute(SELECT_USER_SQL, (user_id,))
+            result = cursor.fetchone()
 
-        return False, None
-
-    def get_user_info(self, user_id: int) -> Optional[Dict]:
-        """Get user information."""
-        self.cursor.execute(
-            """
-            SELECT user_id, username, full_name, email, phone, created_at, last_login
-            FROM users WHERE user_id = ?
-        """,
-            (user_id,),
-        )
-        result = self.cursor.fetchone()
-        return dict(result) if result else None
+        # Rows read inside a transaction may still be rolled back
+        if result and not self._in_write_transaction():
+            self._user_cache.set(user_id, result)
+        return result
 
     def create_account(
         self,
@@ -451,129 +1555,100 @@ class DatabaseManager:
     ) -> Tuple[Optional[int], str]:
         """Create a new bank account for a user."""
         try:
-            # Generate unique account number
-            account_number = self._generate_account_number()
-
-            self.cursor.execute(
-                """
-                INSERT INTO accounts (user_id, account_number, account_type,
-                                    balance, interest_rate, credit_limit)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    user_id,
-                    account_number,
-                    account_type,
-                    initial_balance,
-                    interest_rate,
-                    credit_limit,
-                ),
-            )
-            self.conn.commit()
-
-            account_id = self.cursor.lastrowid
-
-            # Record initial deposit if balance > 0
-            if initial_balance > 0:
-                self.add_transaction(
-                    account_id,
-                    "Deposit",
-                    initial_balance,
-                    "Initial Deposit",
-                    initial_balance,
-                )
+            # The account and its initial deposit are committed together
+            with self.transaction():
+                # A taken account number inserts nothing and returns no row;
+                # retry with a fresh one instead of checking before each insert
+                for _ in range(ACCOUNT_NUMBER_ATTEMPTS):
+                    account_number = self._generate_account_number()
+                    self.cursor.execute(
+                        INSERT_ACCOUNT_SQL,
+                        (
+                            user_id,
+                            account_number,
+                            account_type,
+                            _to_cents(initial_balance),
+                            interest_rate,
+                            _to_cents(credit_limit),
+                        ),
+                    )
+                    row = self.cursor.fetchone()
+                    if row:
+                        account_id = row[0]
+                        break
+                else:
+                    return None, "Could not generate a unique account number"
+
+                # Record initial deposit if balance > 0
+                if initial_balance > 0:
+                    self.add_transaction(
+                        account_id,
+                        "Deposit",
+                        initial_balance,
+                        "Initial Deposit",
+                        initial_balance,
+                    )
 
             return account_id, account_number
         except Exception as e:
             return None, str(e)
 
     def _generate_account_number(self) -> str:
-        """Generate a unique account number."""
-        import random
-
-        while True:
-            account_number = f"{random.randint(1000000000, 9999999999)}"
-            self.cursor.execute(
-                """
-                SELECT account_id FROM accounts WHERE account_number = ?
-            """,
-                (account_number,),
-            )
-            if not self.cursor.fetchone():
-                return account_number
+        """Generate a random account number; uniqueness is enforced on insert."""
+        return f"{secrets.randbelow(9_000_000_000) + 1_000_000_000:010d}"
 
-    def get_user_accounts(self, user_id: int) -> List[Dict]:
+    def get_user_accounts(self, user_id: int) -> List[sqlite3.Row]:
         """Get all accounts for a user."""
-        self.cursor.execute(
-            """
-            SELECT account_id, account_number, account_type, balance,
-                   interest_rate, credit_limit, status, created_at
-            FROM accounts
-            WHERE user_id = ? AND status = 'active'
-            ORDER BY created_at DESC
-        """,
-            (user_id,),
-        )
-        return [dict(row) for row in self.cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.execute(SELECT_USER_ACCOUNTS_SQL, (user_id,))
+            return cursor.fetchall()
 
-    def get_account(self, account_id: int) -> Optional[Dict]:
+    def get_account(self, account_id: int) -> Optional[sqlite3.Row]:
         """Get account details."""
-        self.cursor.execute(
-            """
-            SELECT account_id, user_id, account_number, account_type, balance,
-                   interest_rate, credit_limit, status, created_at, last_interest_date
-            FROM accounts WHERE account_id = ?
-        """,
-            (account_id,),
-        )
-        result = self.cursor.fetchone()
-        return dict(result) if result else None
+        cached = self._account_cache.get(account_id)
+        if cached is not None:
+            return cached
+
+        with self._read_connection() as conn:
+            cursor = conn.execute(SELECT_ACCOUNT_SQL, (account_id,))
+            result = cursor.fetchone()
+
+        # Rows read inside a transaction may still be rolled back
+        if result and not self._in_write_transaction():
+            self._account_cache.set(account_id, result)
+        return result
 
     def update_balance(self, account_id: int, new_balance: float) -> bool:
         """Update account balance."""
         try:
             self.cursor.execute(
-                """
-                UPDATE accounts SET balance = ? WHERE account_id = ?
-            """,
-                (new_balance, account_id),
+                UPDATE_BALANCE_SQL, (_to_cents(new_balance), account_id)
             )
-            self.conn.commit()
+            self._commit()
+            self._account_cache.pop(account_id)
             return True
         except Exception:
             return False
 
     def delete_account(self, account_id: int) -> Tuple[bool, str]:
-        """Delete an account and all associated data."""
-        try:
-            # Check if account exists
-            account = self.get_account(account_id)
-            if not account:
-                return False, "Account not found"
-
-            # Delete associated transactions
-            self.cursor.execute(
-                "DELETE FROM transactions WHERE account_id = ?", (account_id,)
-            )
-
-            # Delete associated transfers
-            self.cursor.execute(
-                """
-                DELETE FROM transfers
-                WHERE from_account_id = ? OR to_account_id = ?
-            """,
-                (account_id, account_id),
-            )
+        """
+        Delete an account and all associated data.
 
-            # Delete the account
-            self.cursor.execute(
-                "DELETE FROM accounts WHERE account_id = ?", (account_id,)
-            )
+        Transactions and transfers are removed by the
+        trg_accounts_delete_cascade trigger within the same transaction.
+        """
+        try:
+            with self.transaction():
+                self.cursor.execute(
+                    "DELETE FROM accounts WHERE account_id = ?", (account_id,)
+                )
+                if self.cursor.rowcount != 1:
+                    return False, "Account not found"
 
-            self.conn.commit()
+            self._account_cache.pop(account_id)
             return True, "Account deleted successfully"
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             return False, f"Error deleting account: {str(e)}"
 
     def add_transaction(
@@ -587,59 +1662,72 @@ class DatabaseManager:
     ) -> int:
         """Add a transaction record."""
         self.cursor.execute(
-            """
-            INSERT INTO transactions (account_id, transaction_type, amount,
-                                    category, description, balance_after)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """,
+            INSERT_TRANSACTION_SQL,
             (
                 account_id,
                 transaction_type,
-                amount,
+                _to_cents(amount),
                 category,
                 description,
-                balance_after,
+                _to_cents(balance_after),
             ),
         )
-        self.conn.commit()
+        self._commit()
         return self.cursor.lastrowid
 
-    def get_transactions(
+    def iter_transactions(
         self,
         account_id: int,
         limit: int = None,
         category: str = None,
         start_date: str = None,
         end_date: str = None,
-    ) -> List[Dict]:
-        """Get transactions for an account with optional filters."""
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Stream transactions for an account with optional filters.
+
+        Same filters and ordering as get_transactions, but rows are yielded
+        as they are fetched instead of being collected into a list.
+        """
         query = """
-            SELECT transaction_id, transaction_type, amount, category,
-                   description, balance_after, timestamp
+            SELECT transaction_id, transaction_type, amount / 100.0 AS amount,
+                   category, description, balance_after / 100.0 AS balance_after,
+                   timestamp
             FROM transactions
             WHERE account_id = ?
         """
         params = [account_id]
 
-        if category:
-            query += " AND category = ?"
-            params.append(category)
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date)
-
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date)
+        # Every value is bound, so each combination of filters maps to one
+        # SQL string that stays in the statement cache
+        for value, clause in (
+            (category, " AND category = ?"),
+            (start_date, " AND timestamp >= ?"),
+            (end_date, " AND timestamp <= ?"),
+        ):
+            if value:
+                query += clause
+                params.append(value)
 
-        query += " ORDER BY timestamp DESC, transaction_id DESC"
+        # LIMIT is always bound (-1 means no limit), so it does not double
+        # the number of distinct SQL strings
+        query += " ORDER BY timestamp DESC, transaction_id DESC LIMIT ?"
+        params.append(int(limit) if limit else -1)
 
-        if limit:
-            query += f" LIMIT {limit}"
+        return self._iter_rows(query, params)
 
-        self.cursor.execute(query, params)
-        return [dict(row) for row in self.cursor.fetchall()]
+    def get_transactions(
+        self,
+        account_id: int,
+        limit: int = None,
+        category: str = None,
+        start_date: str = None,
+        end_date: str = None,
+    ) -> List[sqlite3.Row]:
+        """Get transactions for an account with optional filters."""
+        return list(
+            self.iter_transactions(account_id, limit, category, start_date, end_date)
+        )
 
     def create_transfer(
         self,
@@ -649,82 +1737,98 @@ class DatabaseManager:
         description: str = None,
     ) -> Tuple[bool, str]:
         """Transfer money between accounts."""
+        amount = _to_cents(amount)
         try:
-            # Get account balances
-            from_account = self.get_account(from_account_id)
-            to_account = self.get_account(to_account_id)
+            # Take the write lock up front so the balances read below cannot
+            # change before the updates are applied
+            with self.transaction():
 
-            if not from_account or not to_account:
-                return False, "Invalid account"
+                # Get both accounts in one query
+                self.cursor.execute(
+                    SELECT_TRANSFER_ACCOUNTS_SQL, (from_account_id, to_account_id)
+                )
+                rows = {row["account_id"]: row for row in self.cursor.fetchall()}
+                from_account = rows.get(from_account_id)
+                to_account = rows.get(to_account_id)
 
-            if from_account["balance"] < amount:
-                return False, "Insufficient funds"
+                if not from_account or not to_account:
+                    return False, "Invalid account"
 
-            # Update balances
-            new_from_balance = from_account["balance"] - amount
-            new_to_balance = to_account["balance"] + amount
+                # Debit only if the balance covers the amount
+                self.cursor.execute(
+                    DEBIT_BALANCE_SQL, (amount, from_account_id, amount)
+                )
+                if self.cursor.rowcount != 1:
+                    return False, "Insufficient funds"
+                self.cursor.execute(CREDIT_BALANCE_SQL, (amount, to_account_id))
 
-            self.update_balance(from_account_id, new_from_balance)
-            self.update_balance(to_account_id, new_to_balance)
+                new_from_balance = from_account["balance"] - amount
+                new_to_balance = to_account["balance"] + amount
 
-            # Record transfer
-            self.cursor.execute(
-                """
-                INSERT INTO transfers (from_account_id, to_account_id, amount, description)
-                VALUES (?, ?, ?, ?)
-            """,
-                (from_account_id, to_account_id, amount, description),
-            )
+                # Record transfer
+                self.cursor.execute(
+                    INSERT_TRANSFER_SQL,
+                    (from_account_id, to_account_id, amount, description),
+                )
 
-            # Record transactions
-            self.add_transaction(
-                from_account_id,
-                "Transfer Out",
-                amount,
-                f"Transfer to account {to_account['account_number']}",
-                new_from_balance,
-                "Transfer",
-            )
-            self.add_transaction(
-                to_account_id,
-                "Transfer In",
-                amount,
-                f"Transfer from account {from_account['account_number']}",
-                new_to_balance,
-                "Transfer",
-            )
+                # Record transactions
+                self.cursor.executemany(
+                    INSERT_TRANSACTION_SQL,
+                    [
+                        (
+                            from_account_id,
+                            "Transfer Out",
+                            amount,
+                            "Transfer",
+                            f"Transfer to account {to_account['account_number']}",
+                            new_from_balance,
+                        ),
+                        (
+                            to_account_id,
+                            "Transfer In",
+                            amount,
+                            "Transfer",
+                            f"Transfer from account {from_account['account_number']}",
+                            new_to_balance,
+                        ),
+                    ],
+                )
 
-            self.conn.commit()
+            self._account_cache.pop(from_account_id, to_account_id)
             return True, "Transfer successful"
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             return False, str(e)
 
-    def get_account_statistics(self, account_id: int) -> Dict:
-        """Get statistics for an account."""
-        self.cursor.execute(
-            """
-            SELECT
-                COUNT(*) as total_transactions,
-                SUM(CASE WHEN transaction_type = 'Deposit' THEN amount ELSE 0 END) as total_deposits,
-                SUM(CASE WHEN transaction_type = 'Withdrawal' THEN amount ELSE 0 END) as total_withdrawals,
-                SUM(CASE WHEN transaction_type = 'Transfer In' THEN amount ELSE 0 END) as total_transfers_in,
-                SUM(CASE WHEN transaction_type = 'Transfer Out' THEN amount ELSE 0 END) as total_transfers_out
-            FROM transactions
-            WHERE account_id = ?
-        """,
-            (account_id,),
-        )
+    def get_account_statistics(self, account_id: int) -> sqlite3.Row:
+        """
+        Get statistics for an account.
 
-        result = self.cursor.fetchone()
-        return dict(result) if result else {}
+        Totals are kept up to date by triggers on the transactions table,
+        so this is a single-row lookup regardless of history length. An
+        account without transactions gets a row of zeros.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT COALESCE(s.total_transactions, 0) AS total_transactions,
+                       COALESCE(s.total_deposits, 0) / 100.0 AS total_deposits,
+                       COALESCE(s.total_withdrawals, 0) / 100.0 AS total_withdrawals,
+                       COALESCE(s.total_transfers_in, 0) / 100.0 AS total_transfers_in,
+                       COALESCE(s.total_transfers_out, 0) / 100.0 AS total_transfers_out
+                FROM (SELECT ? AS account_id) AS a
+                LEFT JOIN account_stats AS s ON s.account_id = a.account_id
+            """,
+                (account_id,),
+            )
+            return cursor.fetchone()
 
     def get_spending_by_category(
         self, account_id: int, start_date: str = None
-    ) -> List[Dict]:
+    ) -> List[sqlite3.Row]:
         """Get spending grouped by category."""
         query = """
-            SELECT category, SUM(amount) as total, COUNT(*) as count
+            SELECT category, SUM(amount) / 100.0 as total, COUNT(*) as count
             FROM transactions
             WHERE account_id = ?
             AND transaction_type IN ('Withdrawal', 'Transfer Out')
@@ -736,10 +1840,52 @@ class DatabaseManager:
             query += " AND timestamp >= ?"
             params.append(start_date)
 
+        # Only two SQL strings are possible (with or without start_date),
+        # so both stay in the statement cache
         query += " GROUP BY category ORDER BY total DESC"
 
-        self.cursor.execute(query, params)
-        return [dict(row) for row in self.cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.execute(query, params)
+            return cursor.fetchall()
+
+    def get_spending_matrix(
+        self, account_ids: List[int], start_date: str = None
+    ) -> Tuple[List[str], List[float]]:
+        """
+        Get spending per category summed across several accounts.
+
+        The totals are aggregated by SQLite over integer cents in a single
+        query, instead of one query per account merged in Python.
+
+        Args:
+            account_ids: Accounts to include
+            start_date: Optional earliest timestamp to include
+
+        Returns:
+            Tuple of (categories, totals) as parallel lists, largest first
+        """
+        if not account_ids:
+            return [], []
+
+        placeholders = ", ".join("?" * len(account_ids))
+        query = f"""
+            SELECT category, SUM(amount) / 100.0 as total
+            FROM transactions
+            WHERE account_id IN ({placeholders})
+            AND transaction_type IN ('Withdrawal', 'Transfer Out')
+            AND category IS NOT NULL
+        """
+        params = list(account_ids)
+
+        if start_date:
+            query += " AND timestamp >= ?"
+            params.append(start_date)
+
+        query += " GROUP BY category ORDER BY total DESC"
+
+        with self._read_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows]
 
     def update_last_interest_date(self, account_id: int, date: str = None) -> bool:
         """
@@ -754,7 +1900,7 @@ class DatabaseManager:
         """
         try:
             if date is None:
-                date = datetime.now().isoformat()
+                date = _now_iso()
 
             self.cursor.execute(
                 """
@@ -762,12 +1908,50 @@ class DatabaseManager:
             """,
                 (date, account_id),
             )
-            self.conn.commit()
+            self._commit()
+            self._account_cache.pop(account_id)
+            return True
+        except Exception:
+            return False
+
+    def apply_interest_batch(
+        self, updates: List[Tuple[int, float]], date: str = None
+    ) -> bool:
+        """
+        Credit interest to several accounts in one transaction.
+
+        Each account's balance and last_interest_date are updated and an
+        Interest transaction is recorded, using one executemany per table
+        and a single commit for the whole batch.
+
+        Args:
+            updates: (account_id, interest_amount) pairs
+            date: ISO format date string (defaults to now)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if date is None:
+            date = _now_iso()
+        cents = [(account_id, _to_cents(amount)) for account_id, amount in updates]
+
+        try:
+            with self.transaction():
+                self.cursor.executemany(
+                    APPLY_INTEREST_SQL,
+                    [(amount, date, account_id) for account_id, amount in cents],
+                )
+                self.cursor.executemany(
+                    INSERT_INTEREST_TRANSACTION_SQL,
+                    [(amount, account_id) for account_id, amount in cents],
+                )
             return True
         except Exception:
             return False
+        finally:
+            self._account_cache.pop(*(account_id for account_id, _ in cents))
 
-    def get_savings_accounts_for_interest(self, user_id: int = None) -> List[Dict]:
+    def get_savings_accounts_for_interest(self, user_id: int = None) -> List[sqlite3.Row]:
         """
         Get all savings accounts that may be eligible for interest.
 
@@ -775,10 +1959,10 @@ class DatabaseManager:
             user_id: Optional user ID to filter by specific user
 
         Returns:
-            List of account dictionaries with interest information
+            List of account rows with interest information
         """
         query = """
-            SELECT account_id, user_id, account_number, balance,
+            SELECT account_id, user_id, account_number, balance / 100.0 AS balance,
                    interest_rate, last_interest_date, created_at
             FROM accounts
             WHERE account_type = 'Savings' AND status = 'active'
@@ -792,7 +1976,7 @@ class DatabaseManager:
         query += " ORDER BY last_interest_date ASC NULLS FIRST"
 
         self.cursor.execute(query, params)
-        return [dict(row) for row in self.cursor.fetchall()]
+        return self.cursor.fetchall()
 
     # ============================================================================
     # Session Management Methods
@@ -815,14 +1999,10 @@ class DatabaseManager:
         """
         try:
             self.cursor.execute(
-                """
-                INSERT INTO sessions (user_id, session_token, created_at,
-                                    last_activity, expires_at)
-                VALUES (?, ?, ?, ?, ?)
-            """,
+                INSERT_SESSION_SQL,
                 (user_id, session_token, created_at, created_at, expires_at),
             )
-            self.conn.commit()
+            self._commit()
             return True
         except Exception:
             return False
@@ -838,15 +2018,7 @@ class DatabaseManager:
             Session dictionary or None if not found
         """
         try:
-            self.cursor.execute(
-                """
-                SELECT session_id, user_id, session_token, created_at,
-                       last_activity, expires_at
-                FROM sessions
-                WHERE session_token = ?
-            """,
-                (session_token,),
-            )
+            self.cursor.execute(SELECT_SESSION_SQL, (session_token,))
             row = self.cursor.fetchone()
             return dict(row) if row else None
         except Exception:
@@ -868,14 +2040,9 @@ class DatabaseManager:
         """
         try:
             self.cursor.execute(
-                """
-                UPDATE sessions
-                SET last_activity = ?, expires_at = ?
-                WHERE session_token = ?
-            """,
-                (last_activity, expires_at, session_token),
+                UPDATE_SESSION_SQL, (last_activity, expires_at, session_token)
             )
-            self.conn.commit()
+            self._commit()
             return self.cursor.rowcount > 0
         except Exception:
             return False
@@ -891,13 +2058,8 @@ class DatabaseManager:
             True if successful, False otherwise
         """
         try:
-            self.cursor.execute(
-                """
-                DELETE FROM sessions WHERE session_token = ?
-            """,
-                (session_token,),
-            )
-            self.conn.commit()
+            self.cursor.execute(DELETE_SESSION_SQL, (session_token,))
+            self._commit()
             return True
         except Exception:
             return False
@@ -919,7 +2081,7 @@ class DatabaseManager:
             """,
                 (user_id,),
             )
-            self.conn.commit()
+            self._commit()
             return True
         except Exception:
             return False
@@ -928,53 +2090,60 @@ class DatabaseManager:
         """
         Delete all expired sessions from the database.
 
+        Sessions are deleted in batches of SESSION_CLEANUP_BATCH, committing
+        after each, so a large backlog never holds the write lock for long.
+
         Args:
             current_time: Current timestamp (ISO format)
 
         Returns:
             Number of sessions deleted
         """
+        deleted = 0
         try:
-            self.cursor.execute(
-                """
-                DELETE FROM sessions WHERE expires_at < ?
-            """,
-                (current_time,),
-            )
-            self.conn.commit()
-            return self.cursor.rowcount
+            while True:
+                self.cursor.execute(
+                    DELETE_EXPIRED_SESSIONS_SQL,
+                    (current_time, SESSION_CLEANUP_BATCH),
+                )
+                batch = self.cursor.rowcount
+                self._commit()
+                deleted += batch
+                if batch < SESSION_CLEANUP_BATCH:
+                    return deleted
         except Exception:
-            return 0
+            return deleted
 
     # ============================================================================
     # Password History & Expiration Methods
     # ============================================================================
 
-    def add_password_to_history(self, user_id: int, password_hash: str) -> bool:
+    def add_password_to_history(
+        self, user_id: int, password_hash: str, password: str = None
+    ) -> bool:
         """
         Add a password to the user's password history.
 
         Args:
             user_id: ID of the user
             password_hash: Hashed password to store
+            password: Plain text password, if known; lets check_password_reuse
+                match this entry without running the password hash
 
         Returns:
             True if successful, False otherwise
         """
         try:
+            tag = _reuse_tag(password) if password else None
             self.cursor.execute(
-                """
-                INSERT INTO password_history (user_id, password_hash, created_at)
-                VALUES (?, ?, ?)
-            """,
-                (user_id, password_hash, datetime.now().isoformat()),
+                INSERT_PASSWORD_HISTORY_SQL, (user_id, password_hash, _now_iso(), tag)
             )
-            self.conn.commit()
+            self._commit()
             return True
         except Exception:
             return False
 
-    def get_password_history(self, user_id: int, limit: int = 5) -> List[Dict]:
+    def get_password_history(self, user_id: int, limit: int = 5) -> List[sqlite3.Row]:
         """
         Get the user's password history (most recent first).
 
@@ -983,20 +2152,11 @@ class DatabaseManager:
             limit: Maximum number of passwords to return (default: 5)
 
         Returns:
-            List of password history dictionaries
+            List of password history rows
         """
         try:
-            self.cursor.execute(
-                """
-                SELECT history_id, user_id, password_hash, created_at
-                FROM password_history
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            """,
-                (user_id, limit),
-            )
-            return [dict(row) for row in self.cursor.fetchall()]
+            self.cursor.execute(SELECT_PASSWORD_HISTORY_SQL, (user_id, limit))
+            return self.cursor.fetchall()
         except Exception:
             return []
 
@@ -1006,6 +2166,9 @@ class DatabaseManager:
         """
         Check if a new password has been used recently.
 
+        Entries stored with a reuse tag are compared by HMAC; only older
+        entries without one are checked with the (slow) password hash.
+
         Args:
             user_id: ID of the user
             new_password: Plain text password to check
@@ -1015,10 +2178,17 @@ class DatabaseManager:
             Tuple of (is_reused, message)
         """
         try:
-            history = self.get_password_history(user_id, history_count)
-
-            for entry in history:
-                if self.verify_password(new_password, entry["password_hash"]):
+            self.cursor.execute(SELECT_REUSE_CANDIDATES_SQL, (user_id, history_count))
+            candidates = self.cursor.fetchall()
+            tag = _reuse_tag(new_password)
+
+            # Only the hash and tag are read, so unpack rows positionally
+            for password_hash, reuse_tag in candidates:
+                if reuse_tag is not None and tag is not None:
+                    reused = hmac.compare_digest(reuse_tag, tag)
+                else:
+                    reused = self.verify_password(new_password, password_hash)
+                if reused:
                     return (
                         True,
                         f"Password has been used recently. Please choose a different password.",
@@ -1046,7 +2216,7 @@ class DatabaseManager:
         """
         try:
             if changed_at is None:
-                changed_at = datetime.now().isoformat()
+                changed_at = _now_iso()
 
             self.cursor.execute(
                 """
@@ -1054,7 +2224,8 @@ class DatabaseManager:
             """,
                 (changed_at, user_id),
             )
-            self.conn.commit()
+            self._commit()
+            self._auth_cache.pop(("password_changed", user_id))
             return True
         except Exception:
             return False
@@ -1069,17 +2240,20 @@ class DatabaseManager:
         Returns:
             ISO format timestamp or None if not found
         """
+        key = ("password_changed", user_id)
+        changed_at = self._auth_lookup(key)
+        if changed_at is not None:
+            return changed_at
+
         try:
-            self.cursor.execute(
-                """
-                SELECT password_changed_at FROM users WHERE user_id = ?
-            """,
-                (user_id,),
-            )
+            self.cursor.execute(SELECT_PASSWORD_CHANGED_SQL, (user_id,))
             result = self.cursor.fetchone()
-            return result["password_changed_at"] if result else None
+            changed_at = result["password_changed_at"] if result else None
         except Exception:
             return None
+        if changed_at is not None:
+            self._auth_cache.set(key, changed_at)
+        return changed_at
 
     def change_user_password(
         self,
@@ -1103,17 +2277,40 @@ class DatabaseManager:
         Returns:
             Tuple of (success, message)
         """
-        try:
-            # Handle both user_id (int) and username (str)
-            if isinstance(user_identifier, str):
-                # It's a username, authenticate to get user_id
-                user_id = self.authenticate_user(user_identifier, old_password)
-                if not user_id:
-                    return (False, "Current password is incorrect")
-            else:
-                # It's a user_id
-                user_id = user_identifier
+        # A username is checked by authenticate_user; the password is then
+        # not verified a second time
+        if isinstance(user_identifier, str):
+            return self.change_user_password_by_username(
+                user_identifier, old_password, new_password, history_count
+            )
+
+        return self._change_password(
+            user_identifier, old_password, new_password, history_count, verify=True
+        )
+
+    def _change_password(
+        self,
+        user_id: int,
+        old_password: str,
+        new_password: str,
+        history_count: int,
+        verify: bool,
+    ) -> Tuple[bool, str]:
+        """
+        Change a password, optionally verifying the old one first.
 
+        Args:
+            user_id: ID of the user
+            old_password: Current password (plain text)
+            new_password: New password (plain text)
+            history_count: Number of previous passwords to check
+            verify: Check old_password against the stored hash; pass False
+                only when the caller has already authenticated the user
+
+        Returns:
+            Tuple of (success, message)
+        """
+        try:
             # Get current password hash
             self.cursor.execute(
                 """
@@ -1126,10 +2323,10 @@ class DatabaseManager:
             if not result:
                 return (False, "User not found")
 
-            # Verify old password (only if we didn't already authenticate via username)
-            if not isinstance(user_identifier, str):
-                if not self.verify_password(old_password, result["password_hash"]):
-                    return (False, "Current password is incorrect")
+            if verify and not self.verify_password(
+                old_password, result["password_hash"]
+            ):
+                return (False, "Current password is incorrect")
 
             # Check if new password was used recently
             is_reused, reuse_message = self.check_password_reuse(
@@ -1139,21 +2336,26 @@ class DatabaseManager:
                 return (False, reuse_message)
 
             # Hash new password
-            new_hash = self.hash_password(new_password)
+            new_hash = self.hash_password(new_password, self.bcrypt_cost)
 
-            # Update password
-            self.cursor.execute(
-                """
-                UPDATE users SET password_hash = ?, password_changed_at = ?
-                WHERE user_id = ?
-            """,
-                (new_hash, datetime.now().isoformat(), user_id),
-            )
+            old_tag = _reuse_tag(old_password) if old_password else None
+            now = _now_iso()
 
-            # Add old password to history
-            self.add_password_to_history(user_id, result["password_hash"])
+            # Update password and record the old one with a single commit
+            with self.transaction():
+                self.cursor.execute(
+                    """
+                    UPDATE users SET password_hash = ?, password_changed_at = ?
+                    WHERE user_id = ?
+                """,
+                    (new_hash, now, user_id),
+                )
+                self.cursor.execute(
+                    INSERT_PASSWORD_HISTORY_SQL,
+                    (user_id, result["password_hash"], now, old_tag),
+                )
 
-            self.conn.commit()
+            self._auth_cache.pop(("password_changed", user_id))
             return (True, "Password changed successfully")
 
         except Exception as e:
@@ -1185,9 +2387,9 @@ class DatabaseManager:
             if not user_id:
                 return (False, "Current password is incorrect")
 
-            # Call the main change_user_password method
-            return self.change_user_password(
-                user_id, old_password, new_password, history_count
+            # Already authenticated; skip the second password check
+            return self._change_password(
+                user_id, old_password, new_password, history_count, verify=False
             )
 
         except Exception as e:
@@ -1204,56 +2406,26 @@ class DatabaseManager:
         Args:
             user_id: ID of the user
             secret_key: Base32-encoded TOTP secret
-            backup_codes: List of backup codes (will be stored as JSON)
+            backup_codes: List of backup codes (only their hashes are stored)
 
         Returns:
             Tuple of (success, message)
         """
         try:
-            import json
-
-            # Store backup codes as JSON string
-            backup_codes_json = json.dumps(backup_codes)
-
-            # Check if user already has 2FA record
-            self.cursor.execute(
-                """
-                SELECT totp_id FROM totp_secrets WHERE user_id = ?
-            """,
-                (user_id,),
-            )
-            existing = self.cursor.fetchone()
+            with self.transaction():
+                # Insert the secret, or replace an earlier one
+                self.cursor.execute(UPSERT_TOTP_SECRET_SQL, (user_id, secret_key))
+                self._store_backup_codes(user_id, backup_codes)
 
-            if existing:
-                # Update existing record
+                # Update user table
                 self.cursor.execute(
                     """
-                    UPDATE totp_secrets
-                    SET secret_key = ?, backup_codes = ?, enabled = 1,
-                        created_at = CURRENT_TIMESTAMP
-                    WHERE user_id = ?
-                """,
-                    (secret_key, backup_codes_json, user_id),
-                )
-            else:
-                # Insert new record
-                self.cursor.execute(
-                    """
-                    INSERT INTO totp_secrets (user_id, secret_key, backup_codes, enabled)
-                    VALUES (?, ?, ?, 1)
+                    UPDATE users SET totp_enabled = 1 WHERE user_id = ?
                 """,
-                    (user_id, secret_key, backup_codes_json),
+                    (user_id,),
                 )
 
-            # Update user table
-            self.cursor.execute(
-                """
-                UPDATE users SET totp_enabled = 1 WHERE user_id = ?
-            """,
-                (user_id,),
-            )
-
-            self.conn.commit()
+            self._forget_2fa(user_id)
             return (True, "Two-Factor Authentication enabled successfully")
 
         except Exception as e:
@@ -1270,23 +2442,25 @@ class DatabaseManager:
             Tuple of (success, message)
         """
         try:
-            # Update totp_secrets table
-            self.cursor.execute(
-                """
-                UPDATE totp_secrets SET enabled = 0 WHERE user_id = ?
-            """,
-                (user_id,),
-            )
+            with self.transaction():
+                # Update totp_secrets table and drop the backup codes
+                self.cursor.execute(
+                    """
+                    UPDATE totp_secrets SET enabled = 0 WHERE user_id = ?
+                """,
+                    (user_id,),
+                )
+                self._store_backup_codes(user_id, [])
 
-            # Update user table
-            self.cursor.execute(
-                """
-                UPDATE users SET totp_enabled = 0 WHERE user_id = ?
-            """,
-                (user_id,),
-            )
+                # Update user table
+                self.cursor.execute(
+                    """
+                    UPDATE users SET totp_enabled = 0 WHERE user_id = ?
+                """,
+                    (user_id,),
+                )
 
-            self.conn.commit()
+            self._forget_2fa(user_id)
             return (True, "Two-Factor Authentication disabled successfully")
 
         except Exception as e:
@@ -1302,31 +2476,19 @@ class DatabaseManager:
         Returns:
             True if 2FA is enabled, False otherwise
         """
-        try:
-            self.cursor.execute(
-                """
-                SELECT enabled FROM totp_secrets WHERE user_id = ?
-            """,
-                (user_id,),
-            )
-            result = self.cursor.fetchone()
-
-            if result and result["enabled"] == 1:
-                return True
-
-            # Also check user table as backup
-            self.cursor.execute(
-                """
-                SELECT totp_enabled FROM users WHERE user_id = ?
-            """,
-                (user_id,),
-            )
-            user_result = self.cursor.fetchone()
-
-            return user_result and user_result["totp_enabled"] == 1
+        key = ("2fa_enabled", user_id)
+        enabled = self._auth_lookup(key)
+        if enabled is not None:
+            return enabled
 
+        try:
+            # Enabled in totp_secrets, or in the users table as a fallback
+            self.cursor.execute(SELECT_2FA_ENABLED_SQL, (user_id,))
+            enabled = bool(self.cursor.fetchone()[0])
         except Exception:
             return False
+        self._auth_cache.set(key, enabled)
+        return enabled
 
     def get_2fa_secret(self, user_id: int) -> Optional[str]:
         """
@@ -1338,88 +2500,81 @@ class DatabaseManager:
         Returns:
             TOTP secret key or None if not found
         """
+        # Never cached, so the secret is not kept in memory between checks
         try:
-            self.cursor.execute(
-                """
-                SELECT secret_key FROM totp_secrets
-                WHERE user_id = ? AND enabled = 1
-            """,
-                (user_id,),
-            )
+            self.cursor.execute(SELECT_2FA_SECRET_SQL, (user_id,))
             result = self.cursor.fetchone()
-
             return result["secret_key"] if result else None
-
         except Exception:
             return None
 
-    def get_backup_codes(self, user_id: int) -> List[str]:
+    def _forget_2fa(self, user_id: int):
+        """Drop the cached 2FA flag for a user after enabling or disabling."""
+        self._auth_cache.pop(("2fa_enabled", user_id))
+
+    def _auth_lookup(self, key):
+        """
+        Return a cached auth value, or None if it must be read again.
+
+        The whole cache is dropped once another connection (for example
+        another DatabaseManager on the same file) has committed, so a
+        change made there is seen on the next lookup instead of after
+        AUTH_CACHE_TTL.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._auth_cache.clear()
+            return None
+        return self._auth_cache.get(key)
+
+    def get_backup_code_count(self, user_id: int) -> int:
         """
-        Get backup codes for a user.
+        Count a user's unused backup codes.
 
         Args:
             user_id: ID of the user
 
         Returns:
-            List of backup codes or empty list if not found
+            Number of unused backup codes (0 if 2FA is not enabled)
         """
         try:
-            import json
-
-            self.cursor.execute(
-                """
-                SELECT backup_codes FROM totp_secrets
-                WHERE user_id = ? AND enabled = 1
-            """,
-                (user_id,),
-            )
-            result = self.cursor.fetchone()
-
-            if result and result["backup_codes"]:
-                return json.loads(result["backup_codes"])
-
-            return []
-
+            self.cursor.execute(COUNT_BACKUP_CODES_SQL, (user_id,))
+            return self.cursor.fetchone()[0]
         except Exception:
-            return []
+            return 0
 
-    def use_backup_code(self, user_id: int, used_code: str) -> Tuple[bool, str]:
+    def use_backup_code(self, user_id: int, code: str) -> Tuple[bool, str]:
         """
-        Mark a backup code as used by removing it from the list.
+        Verify a backup code and mark it as used.
+
+        The code is matched by hash, ignoring case, spaces and dashes; each
+        code can only be used once.
 
         Args:
             user_id: ID of the user
-            used_code: The backup code that was used
+            code: The backup code entered by the user
 
         Returns:
             Tuple of (success, message)
         """
         try:
-            import json
-
-            # Get current backup codes
-            current_codes = self.get_backup_codes(user_id)
-
-            if used_code not in current_codes:
-                return (False, "Invalid backup code")
-
-            # Remove the used code
-            current_codes.remove(used_code)
-
-            # Update database
-            backup_codes_json = json.dumps(current_codes)
-            self.cursor.execute(
-                """
-                UPDATE totp_secrets
-                SET backup_codes = ?, last_used = CURRENT_TIMESTAMP
-                WHERE user_id = ?
-            """,
-                (backup_codes_json, user_id),
-            )
+            with self.transaction():
+                self.cursor.execute(
+                    USE_BACKUP_CODE_SQL, (user_id, _backup_code_hash(code), user_id)
+                )
+                if self.cursor.rowcount == 0:
+                    return (False, "Invalid backup code")
 
-            self.conn.commit()
+                self.cursor.execute(
+                    """
+                    UPDATE totp_secrets SET last_used = CURRENT_TIMESTAMP
+                    WHERE user_id = ?
+                """,
+                    (user_id,),
+                )
 
-            remaining = len(current_codes)
+            remaining = self.get_backup_code_count(user_id)
             return (True, f"Backup code accepted. {remaining} backup codes remaining.")
 
         except Exception as e:
@@ -1429,26 +2584,59 @@ class DatabaseManager:
         """
         Update the last used timestamp for 2FA.
 
+        The timestamp is buffered and written together with other pending
+        ones at most every LAST_USED_FLUSH_INTERVAL seconds, when the 2FA
+        status is read, or on close.
+
         Args:
             user_id: ID of the user
 
         Returns:
             True if successful, False otherwise
         """
-        try:
-            self.cursor.execute(
-                """
-                UPDATE totp_secrets
-                SET last_used = CURRENT_TIMESTAMP
-                WHERE user_id = ?
-            """,
-                (user_id,),
+        # Same format as CURRENT_TIMESTAMP
+        now = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        with self._last_used_lock:
+            self._pending_last_used[user_id] = now
+            due = (
+                time.monotonic() - self._last_used_flushed >= LAST_USED_FLUSH_INTERVAL
             )
+        return self.flush_2fa_last_used() if due else True
 
-            self.conn.commit()
+    def flush_2fa_last_used(self) -> bool:
+        """
+        Write buffered 2FA last used timestamps in one statement.
+
+        Inside a transaction() block nothing is written, so a rollback of
+        the block cannot discard the timestamps. If the write fails they
+        are kept for the next flush.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if self._in_write_transaction():
+            return True
+        with self._last_used_lock:
+            pending = self._pending_last_used
+            self._pending_last_used = {}
+            self._last_used_flushed = time.monotonic()
+        if not pending:
+            return True
+
+        try:
+            with self.transaction():
+                self.cursor.executemany(
+                    UPDATE_2FA_LAST_USED_SQL,
+                    [(last_used, user_id) for user_id, last_used in pending.items()],
+                )
             return True
 
         except Exception:
+            # Put the batch back, unless a newer timestamp arrived meanwhile
+            with self._last_used_lock:
+                for user_id, last_used in pending.items():
+                    if self._pending_last_used.get(user_id, "") < last_used:
+                        self._pending_last_used[user_id] = last_used
             return False
 
     def get_2fa_status(self, user_id: int) -> Dict[str, any]:
@@ -1461,6 +2649,7 @@ class DatabaseManager:
         Returns:
             Dictionary with 2FA status information
         """
+        self.flush_2fa_last_used()
         try:
             self.cursor.execute(
                 """
@@ -1473,13 +2662,13 @@ class DatabaseManager:
             result = self.cursor.fetchone()
 
             if result:
-                backup_codes = self.get_backup_codes(user_id)
+                remaining = self.get_backup_code_count(user_id)
                 return {
                     "enabled": result["enabled"] == 1,
                     "created_at": result["created_at"],
                     "last_used": result["last_used"],
-                    "backup_codes_remaining": len(backup_codes),
-                    "has_backup_codes": len(backup_codes) > 0,
+                    "backup_codes_remaining": remaining,
+                    "has_backup_codes": remaining > 0,
                 }
 
             return {
@@ -1513,24 +2702,13 @@ class DatabaseManager:
             Tuple of (success, message)
         """
         try:
-            import json
-
             # Check if 2FA is enabled
             if not self.is_2fa_enabled(user_id):
                 return (False, "2FA is not enabled for this user")
 
-            # Update backup codes
-            backup_codes_json = json.dumps(new_backup_codes)
-            self.cursor.execute(
-                """
-                UPDATE totp_secrets
-                SET backup_codes = ?
-                WHERE user_id = ?
-            """,
-                (backup_codes_json, user_id),
-            )
-
-            self.conn.commit()
+            # Replace backup codes
+            with self.transaction():
+                self._store_backup_codes(user_id, new_backup_codes)
             return (True, f"Generated {len(new_backup_codes)} new backup codes")
 
         except Exception as e:
@@ -1569,34 +2747,173 @@ class DatabaseManager:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            self.cursor.execute(
-                """
-                INSERT INTO audit_logs (
-                    user_id, username, event_type, event_category,
-                    description, ip_address, user_agent, severity, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    user_id,
-                    username,
-                    event_type,
-                    event_category,
-                    description,
-                    ip_address,
-                    user_agent,
-                    severity,
-                    metadata,
-                ),
+        entry = (
+            user_id,
+            username,
+            event_type,
+            event_category,
+            description,
+            ip_address,
+            user_agent,
+            severity,
+            metadata,
+        )
+        with self._audit_lock:
+            self._pending_audit.append(entry)
+            full = len(self._pending_audit) >= AUDIT_BATCH_SIZE
+            if not full:
+                self._schedule_audit_flush()
+        return self.flush_audit_logs() if full else True
+
+    def _schedule_audit_flush(self):
+        """
+        Start the timer that writes the current audit batch, if not running.
+
+        Must be called with _audit_lock held. An in-memory database only
+        exists on the main connection, which the timer thread cannot use,
+        so its entries wait for the next size, read or close flush.
+        """
+        if self._audit_timer is None and self._pool is not None:
+            self._audit_timer = threading.Timer(
+                AUDIT_FLUSH_INTERVAL, self.flush_audit_logs
             )
-            self.conn.commit()
+            self._audit_timer.daemon = True
+            self._audit_timer.start()
+
+    def _audit_connection(self) -> sqlite3.Connection:
+        """
+        Connection that audit batches are written through.
+
+        File databases get a dedicated connection, usable from the flush
+        timer thread and independent of any transaction() on the main
+        connection. Must be called with _audit_write_lock held.
+        """
+        if self._pool is None:
+            return self.conn
+        if self._audit_conn is None:
+            self._audit_conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            self._configure_connection(self._audit_conn)
+        return self._audit_conn
+
+    def flush_audit_logs(self) -> bool:
+        """
+        Insert buffered audit log entries with one commit.
+
+        While this thread has a transaction open on the main connection the
+        entries stay buffered, so a rollback cannot discard them and the
+        audit connection does not wait on our own write lock. Entries that
+        could not be written are kept for the next flush.
+
+        Returns:
+            True if every entry was written, False otherwise
+        """
+        if self._in_write_transaction():
             return True
-        except Exception as e:
-            print(f"Error creating audit log: {e}")
-            return False
+        with self._audit_lock:
+            pending = self._pending_audit
+            self._pending_audit = []
+            if self._audit_timer is not None:
+                self._audit_timer.cancel()
+                self._audit_timer = None
+        if not pending:
+            return True
+
+        with self._audit_write_lock:
+            conn = self._audit_connection()
+            try:
+                with conn:
+                    conn.executemany(INSERT_AUDIT_LOG_SQL, pending)
+                return True
+            except sqlite3.IntegrityError:
+                pass
+            except Exception as e:
+                print(f"Error creating audit logs: {e}")
+                with self._audit_lock:
+                    self._pending_audit[:0] = pending
+                    self._schedule_audit_flush()
+                return False
+
+            # Retry one by one so a bad entry does not take the batch with it
+            success = True
+            for entry in pending:
+                try:
+                    with conn:
+                        conn.execute(INSERT_AUDIT_LOG_SQL, entry)
+                except Exception as e:
+                    print(f"Error creating audit log: {e}")
+                    success = False
+            return success
+
+    def _iter_audit_rows(
+        self,
+        clauses: List[str],
+        params: List,
+        limit: int,
+        offset: int,
+        after_created_at: Optional[str],
+        after_log_id: Optional[int],
+        columns: Tuple[str, ...] = AUDIT_LOG_COLUMNS,
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Stream one newest-first page of audit log rows.
+
+        With after_created_at (and optionally after_log_id, as a tiebreaker)
+        the page starts just after that row, so no rows are skipped with
+        OFFSET.
+
+        Args:
+            clauses: WHERE conditions, combined with AND
+            params: Parameters for the conditions, in order
+            limit: Maximum number of records to return
+            offset: Number of records to skip
+            after_created_at: created_at of the last row of the previous page
+            after_log_id: log_id of the last row of the previous page
+            columns: Columns to select, in order
+
+        Yields:
+            Rows of the given columns, FETCH_BATCH_SIZE rows at a time
+        """
+        self.flush_audit_logs()
+        clauses = list(clauses)
+        params = list(params)
+        if after_created_at is not None and after_log_id is not None:
+            clauses.append("(created_at, log_id) < (?, ?)")
+            params.extend([after_created_at, after_log_id])
+        elif after_created_at is not None:
+            clauses.append("created_at < ?")
+            params.append(after_created_at)
+
+        query = (
+            SEARCH_AUDIT_LOGS_SQL
+            if columns is AUDIT_LOG_COLUMNS
+            else f"SELECT {', '.join(columns)} FROM audit_logs"
+        )
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at DESC, log_id DESC LIMIT ? OFFSET ?"
+
+        yield from self._iter_rows(query, params + [limit, offset])
+
+    def _iter_audit_logs(self, *args) -> Iterator[Dict[str, any]]:
+        """Stream one page of audit logs as dictionaries (see _iter_audit_rows)."""
+        for row in self._iter_audit_rows(*args):
+            yield dict(zip(AUDIT_LOG_COLUMNS, row))
+
+    def _query_audit_logs(self, *args) -> List[Dict[str, any]]:
+        """Fetch one page of audit logs as a list (see _iter_audit_logs)."""
+        return list(self._iter_audit_logs(*args))
 
     def get_audit_logs_by_user(
-        self, user_id: int, limit: int = 100, offset: int = 0
+        self,
+        user_id: int,
+        limit: int = 100,
+        offset: int = 0,
+        after_created_at: Optional[str] = None,
+        after_log_id: Optional[int] = None,
     ) -> List[Dict[str, any]]:
         """
         Get audit logs for a specific user.
@@ -1605,65 +2922,91 @@ class DatabaseManager:
             user_id: User ID
             limit: Maximum number of records to return
             offset: Number of records to skip
+            after_created_at: Start after this created_at (keyset paging)
+            after_log_id: Tiebreaker for after_created_at
 
         Returns:
             List of audit log dictionaries
         """
         try:
-            self.cursor.execute(
-                """
-                SELECT log_id, user_id, username, event_type, event_category,
-                       description, ip_address, user_agent, severity, metadata, created_at
-                FROM audit_logs
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """,
-                (user_id, limit, offset),
+            return self._query_audit_logs(
+                ["user_id = ?"],
+                [user_id],
+                limit,
+                offset,
+                after_created_at,
+                after_log_id,
             )
-
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
         except Exception as e:
             print(f"Error fetching user audit logs: {e}")
             return []
 
     def get_audit_logs_by_date_range(
-        self, start_date: str, end_date: str, limit: int = 1000, offset: int = 0
+        self,
+        start_date: str,
+        end_date: str,
+        limit: int = 1000,
+        offset: int = 0,
+        after_created_at: Optional[str] = None,
+        after_log_id: Optional[int] = None,
     ) -> List[Dict[str, any]]:
         """
         Get audit logs within a date range.
 
         Args:
             start_date: Start date (ISO format)
-            end_date: End date (ISO format)
+            end_date: End date (ISO format; a bare date includes that day)
             limit: Maximum number of records to return
             offset: Number of records to skip
+            after_created_at: Start after this created_at (keyset paging)
+            after_log_id: Tiebreaker for after_created_at
 
         Returns:
             List of audit log dictionaries
         """
         try:
-            self.cursor.execute(
-                """
-                SELECT log_id, user_id, username, event_type, event_category,
-                       description, ip_address, user_agent, severity, metadata, created_at
-                FROM audit_logs
-                WHERE created_at BETWEEN ? AND ?
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """,
-                (start_date, end_date, limit, offset),
+            clauses, params = _audit_filter(
+                {"start_date": start_date, "end_date": end_date}
+            )
+            return self._query_audit_logs(
+                clauses,
+                params,
+                limit,
+                offset,
+                after_created_at,
+                after_log_id,
             )
-
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
         except Exception as e:
             print(f"Error fetching audit logs by date range: {e}")
             return []
 
+    def iter_audit_logs_by_date_range(
+        self, start_date: str, end_date: str, limit: int = 1000, offset: int = 0
+    ) -> Iterator[Dict[str, any]]:
+        """
+        Stream audit logs within a date range without buffering them all.
+
+        Args:
+            start_date: Start date (ISO format)
+            end_date: End date (ISO format; a bare date includes that day)
+            limit: Maximum number of records to return
+            offset: Number of records to skip
+
+        Returns:
+            Iterator of audit log dictionaries
+        """
+        clauses, params = _audit_filter(
+            {"start_date": start_date, "end_date": end_date}
+        )
+        return self._iter_audit_logs(clauses, params, limit, offset, None, None)
+
     def get_audit_logs_by_type(
-        self, event_type: str, limit: int = 100, offset: int = 0
+        self,
+        event_type: str,
+        limit: int = 100,
+        offset: int = 0,
+        after_created_at: Optional[str] = None,
+        after_log_id: Optional[int] = None,
     ) -> List[Dict[str, any]]:
         """
         Get audit logs by event type.
@@ -1672,31 +3015,32 @@ class DatabaseManager:
             event_type: Event type to filter by
             limit: Maximum number of records to return
             offset: Number of records to skip
+            after_created_at: Start after this created_at (keyset paging)
+            after_log_id: Tiebreaker for after_created_at
 
         Returns:
             List of audit log dictionaries
         """
         try:
-            self.cursor.execute(
-                """
-                SELECT log_id, user_id, username, event_type, event_category,
-                       description, ip_address, user_agent, severity, metadata, created_at
-                FROM audit_logs
-                WHERE event_type = ?
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """,
-                (event_type, limit, offset),
+            return self._query_audit_logs(
+                ["event_type = ?"],
+                [event_type],
+                limit,
+                offset,
+                after_created_at,
+                after_log_id,
             )
-
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
         except Exception as e:
             print(f"Error fetching audit logs by type: {e}")
             return []
 
     def get_audit_logs_by_category(
-        self, category: str, limit: int = 100, offset: int = 0
+        self,
+        category: str,
+        limit: int = 100,
+        offset: int = 0,
+        after_created_at: Optional[str] = None,
+        after_log_id: Optional[int] = None,
     ) -> List[Dict[str, any]]:
         """
         Get audit logs by category.
@@ -1705,31 +3049,32 @@ class DatabaseManager:
             category: Category to filter by
             limit: Maximum number of records to return
             offset: Number of records to skip
+            after_created_at: Start after this created_at (keyset paging)
+            after_log_id: Tiebreaker for after_created_at
 
         Returns:
             List of audit log dictionaries
         """
         try:
-            self.cursor.execute(
-                """
-                SELECT log_id, user_id, username, event_type, event_category,
-                       description, ip_address, user_agent, severity, metadata, created_at
-                FROM audit_logs
-                WHERE event_category = ?
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """,
-                (category, limit, offset),
+            return self._query_audit_logs(
+                ["event_category = ?"],
+                [category],
+                limit,
+                offset,
+                after_created_at,
+                after_log_id,
             )
-
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
         except Exception as e:
             print(f"Error fetching audit logs by category: {e}")
             return []
 
     def get_security_events(
-        self, severity: Optional[str] = None, limit: int = 100, offset: int = 0
+        self,
+        severity: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        after_created_at: Optional[str] = None,
+        after_log_id: Optional[int] = None,
     ) -> List[Dict[str, any]]:
         """
         Get security-related audit logs.
@@ -1738,44 +3083,32 @@ class DatabaseManager:
             severity: Filter by severity (INFO, WARNING, CRITICAL)
             limit: Maximum number of records to return
             offset: Number of records to skip
+            after_created_at: Start after this created_at (keyset paging)
+            after_log_id: Tiebreaker for after_created_at
 
         Returns:
             List of audit log dictionaries
         """
         try:
+            clauses = ["event_category = 'SECURITY'"]
+            params = []
             if severity:
-                self.cursor.execute(
-                    """
-                    SELECT log_id, user_id, username, event_type, event_category,
-                           description, ip_address, user_agent, severity, metadata, created_at
-                    FROM audit_logs
-                    WHERE event_category = 'SECURITY' AND severity = ?
-                    ORDER BY created_at DESC
-                    LIMIT ? OFFSET ?
-                """,
-                    (severity, limit, offset),
-                )
-            else:
-                self.cursor.execute(
-                    """
-                    SELECT log_id, user_id, username, event_type, event_category,
-                           description, ip_address, user_agent, severity, metadata, created_at
-                    FROM audit_logs
-                    WHERE event_category = 'SECURITY'
-                    ORDER BY created_at DESC
-                    LIMIT ? OFFSET ?
-                """,
-                    (limit, offset),
-                )
-
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
+                clauses.append("severity = ?")
+                params.append(severity)
+            return self._query_audit_logs(
+                clauses, params, limit, offset, after_created_at, after_log_id
+            )
         except Exception as e:
             print(f"Error fetching security events: {e}")
             return []
 
     def search_audit_logs(
-        self, filters: Dict[str, any], limit: int = 100, offset: int = 0
+        self,
+        filters: Dict[str, any],
+        limit: int = 100,
+        offset: int = 0,
+        after_created_at: Optional[str] = None,
+        after_log_id: Optional[int] = None,
     ) -> List[Dict[str, any]]:
         """
         Search audit logs with multiple filters.
@@ -1788,60 +3121,41 @@ class DatabaseManager:
                 - event_category: str
                 - severity: str
                 - start_date: str (ISO format)
-                - end_date: str (ISO format)
+                - end_date: str (ISO format; a bare date includes that day)
+                - end_before: str (ISO format, exclusive)
             limit: Maximum number of records to return
             offset: Number of records to skip
+            after_created_at: Start after this created_at (keyset paging)
+            after_log_id: Tiebreaker for after_created_at
 
         Returns:
             List of audit log dictionaries
         """
         try:
-            query = """
-                SELECT log_id, user_id, username, event_type, event_category,
-                       description, ip_address, user_agent, severity, metadata, created_at
-                FROM audit_logs
-                WHERE 1=1
-            """
-            params = []
-
-            if "user_id" in filters and filters["user_id"]:
-                query += " AND user_id = ?"
-                params.append(filters["user_id"])
-
-            if "username" in filters and filters["username"]:
-                query += " AND username LIKE ?"
-                params.append(f"%{filters['username']}%")
-
-            if "event_type" in filters and filters["event_type"]:
-                query += " AND event_type = ?"
-                params.append(filters["event_type"])
-
-            if "event_category" in filters and filters["event_category"]:
-                query += " AND event_category = ?"
-                params.append(filters["event_category"])
-
-            if "severity" in filters and filters["severity"]:
-                query += " AND severity = ?"
-                params.append(filters["severity"])
-
-            if "start_date" in filters and filters["start_date"]:
-                query += " AND created_at >= ?"
-                params.append(filters["start_date"])
-
-            if "end_date" in filters and filters["end_date"]:
-                query += " AND created_at <= ?"
-                params.append(filters["end_date"])
-
-            query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-
-            self.cursor.execute(query, params)
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
+            clauses, params = _audit_filter(filters)
+            return self._query_audit_logs(
+                clauses, params, limit, offset, after_created_at, after_log_id
+            )
         except Exception as e:
             print(f"Error searching audit logs: {e}")
             return []
 
+    def iter_audit_logs(
+        self, filters: Dict[str, any], limit: int = 100000
+    ) -> Iterator[Dict[str, any]]:
+        """
+        Stream audit logs matching filter criteria without buffering them all.
+
+        Args:
+            filters: Dictionary of filter criteria (see search_audit_logs)
+            limit: Maximum number of records to return
+
+        Returns:
+            Iterator of audit log dictionaries
+        """
+        clauses, params = _audit_filter(filters)
+        return self._iter_audit_logs(clauses, params, limit, 0, None, None)
+
     def get_audit_log_count(self, filters: Optional[Dict[str, any]] = None) -> int:
         """
         Get total count of audit logs matching filters.
@@ -1852,38 +3166,15 @@ class DatabaseManager:
         Returns:
             Total count of matching records
         """
+        self.flush_audit_logs()
         try:
-            if not filters:
-                self.cursor.execute("SELECT COUNT(*) FROM audit_logs")
+            clauses, params = _audit_filter(filters or {})
+            if not clauses:
+                # Kept up to date by triggers on audit_logs
+                self.cursor.execute("SELECT total FROM audit_log_stats")
                 return self.cursor.fetchone()[0]
 
-            query = "SELECT COUNT(*) FROM audit_logs WHERE 1=1"
-            params = []
-
-            if "user_id" in filters and filters["user_id"]:
-                query += " AND user_id = ?"
-                params.append(filters["user_id"])
-
-            if "event_type" in filters and filters["event_type"]:
-                query += " AND event_type = ?"
-                params.append(filters["event_type"])
-
-            if "event_category" in filters and filters["event_category"]:
-                query += " AND event_category = ?"
-                params.append(filters["event_category"])
-
-            if "severity" in filters and filters["severity"]:
-                query += " AND severity = ?"
-                params.append(filters["severity"])
-
-            if "start_date" in filters and filters["start_date"]:
-                query += " AND created_at >= ?"
-                params.append(filters["start_date"])
-
-            if "end_date" in filters and filters["end_date"]:
-                query += " AND created_at <= ?"
-                params.append(filters["end_date"])
-
+            query = "SELECT COUNT(*) FROM audit_logs WHERE " + " AND ".join(clauses)
             self.cursor.execute(query, params)
             return self.cursor.fetchone()[0]
         except Exception:
@@ -1903,34 +3194,34 @@ class DatabaseManager:
             Tuple of (success, message)
         """
         try:
-            import csv
-
-            logs = self.search_audit_logs(filters or {}, limit=100000)
+            # Rows are written as tuples in column order, without building
+            # a dict per row
+            clauses, params = _audit_filter(filters or {})
+            rows = self._iter_audit_rows(
+                clauses, params, 100000, 0, None, None, AUDIT_EXPORT_COLUMNS
+            )
+            first = next(rows, None)
 
-            if not logs:
+            if first is None:
                 return (False, "No logs found to export")
 
-            with open(filepath, "w", newline="", encoding="utf-8") as csvfile:
-                fieldnames = [
-                    "log_id",
-                    "created_at",
-                    "user_id",
-                    "username",
-                    "event_type",
-                    "event_category",
-                    "severity",
-                    "description",
-                    "ip_address",
-                    "user_agent",
-                    "metadata",
-                ]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                writer.writeheader()
-                for log in logs:
-                    writer.writerow(log)
-
-            return (True, f"Exported {len(logs)} audit logs to {filepath}")
+            with open(
+                filepath,
+                "w",
+                newline="",
+                encoding="utf-8",
+                buffering=EXPORT_BUFFER_SIZE,
+            ) as csvfile:
+                writer = csv.writer(csvfile)
+
+                writer.writerow(AUDIT_EXPORT_COLUMNS)
+                writer.writerow(first)
+                count = 1
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+
+            return (True, f"Exported {count} audit logs to {filepath}")
         except Exception as e:
             return (False, f"Error exporting audit logs: {str(e)}")
 
@@ -1947,6 +3238,7 @@ class DatabaseManager:
         Returns:
             Tuple of (success, message)
         """
+        self.flush_audit_logs()
         try:
             cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
 
@@ -1968,7 +3260,7 @@ class DatabaseManager:
                 )
 
             deleted_count = self.cursor.rowcount
-            self.conn.commit()
+            self._commit()
 
             return (True, f"Deleted {deleted_count} old audit logs")
         except Exception as e:
@@ -1981,76 +3273,32 @@ class DatabaseManager:
         Returns:
             Dictionary containing audit log statistics
         """
+        self.flush_audit_logs()
         try:
-            stats = {}
-
-            # Total logs
-            self.cursor.execute("SELECT COUNT(*) FROM audit_logs")
-            stats["total_logs"] = self.cursor.fetchone()[0]
-
-            # Logs by severity
-            self.cursor.execute(
-                """
-                SELECT severity, COUNT(*) as count
-                FROM audit_logs
-                GROUP BY severity
-            """
-            )
-            stats["by_severity"] = {
-                row["severity"]: row["count"] for row in self.cursor.fetchall()
-            }
-
-            # Logs by category
-            self.cursor.execute(
-                """
-                SELECT event_category, COUNT(*) as count
-                FROM audit_logs
-                GROUP BY event_category
-            """
-            )
-            stats["by_category"] = {
-                row["event_category"]: row["count"] for row in self.cursor.fetchall()
-            }
-
-            # Recent activity (last 24 hours)
-            yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-            self.cursor.execute(
-                """
-                SELECT COUNT(*) FROM audit_logs WHERE created_at >= ?
-            """,
-                (yesterday,),
-            )
-            stats["last_24_hours"] = self.cursor.fetchone()[0]
-
-            # Recent activity (last 7 days)
-            last_week = (datetime.now() - timedelta(days=7)).isoformat()
-            self.cursor.execute(
-                """
-                SELECT COUNT(*) FROM audit_logs WHERE created_at >= ?
-            """,
-                (last_week,),
-            )
-            stats["last_7_days"] = self.cursor.fetchone()[0]
+            stats = {"total_logs": 0, "by_severity": {}, "by_category": {}}
 
-            # Failed login attempts (last 24 hours)
-            self.cursor.execute(
-                """
-                SELECT COUNT(*) FROM audit_logs
-                WHERE event_type = 'LOGIN_FAILED' AND created_at >= ?
-            """,
-                (yesterday,),
-            )
-            stats["failed_logins_24h"] = self.cursor.fetchone()[0]
+            # Totals by severity and category from one grouped scan
+            self.cursor.execute(AUDIT_STATS_BY_GROUP_SQL)
+            for category, severity, count in self.cursor.fetchall():
+                stats["by_category"][category] = (
+                    stats["by_category"].get(category, 0) + count
+                )
+                stats["by_severity"][severity] = (
+                    stats["by_severity"].get(severity, 0) + count
+                )
+            stats["total_logs"] = sum(stats["by_category"].values())
 
-            # Critical events (last 7 days)
-            self.cursor.execute(
-                """
-                SELECT COUNT(*) FROM audit_logs
-                WHERE severity = 'CRITICAL' AND created_at >= ?
-            """,
-                (last_week,),
-            )
-            stats["critical_events_7d"] = self.cursor.fetchone()[0]
+            # Recent activity, from one scan of the last 7 days
+            now = datetime.now()
+            yesterday = (now - timedelta(days=1)).isoformat()
+            last_week = (now - timedelta(days=7)).isoformat()
+            self.cursor.execute(AUDIT_STATS_RECENT_SQL, (yesterday, last_week))
+            (
+                stats["last_24_hours"],
+                stats["last_7_days"],
+                stats["failed_logins_24h"],
+                stats["critical_events_7d"],
+            ) = self.cursor.fetchone()
 
             return stats
         except Exception as e:
@@ -2059,10 +3307,33 @@ class DatabaseManager:
 
     # ==================== End of Audit Log Methods ====================
 
+    def optimize(self):
+        """
+        Let SQLite refresh planner statistics that have gone stale.
+
+        PRAGMA optimize only analyzes tables whose queries would benefit,
+        so it is cheap enough to run on every close.
+        """
+        try:
+            self.conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+
     def close(self):
         """Close database connection."""
+        if self._pool:
+            self._pool.close()
+            self._pool = None
         if self.conn:
+            self.flush_audit_logs()
+            self.flush_2fa_last_used()
+            self.optimize()
             self.conn.close()
+            self.conn = None
+        with self._audit_write_lock:
+            if self._audit_conn:
+                self._audit_conn.close()
+                self._audit_conn = None
 
     def __del__(self):
         """Cleanup database connection."""
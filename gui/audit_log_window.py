@@ -43,6 +43,8 @@ class AuditLogWindow:
         # Pagination
         self.current_page = 1
         self.items_per_page = 50
+        # (created_at, log_id) of the row before each page, for keyset paging
+        self.page_cursors = [None]
         self.total_items = 0
 
         # Filter state
@@ -413,6 +415,7 @@ class AuditLogWindow:
 
         # Reset to first page
         self.current_page = 1
+        self.page_cursors = [None]
         self.load_logs()
 
     def reset_filters(self):
@@ -423,6 +426,7 @@ class AuditLogWindow:
         self.date_range_var.set("Last 7 Days")
         self.filters = {}
         self.current_page = 1
+        self.page_cursors = [None]
         self.load_logs()
 
     def load_logs(self):
@@ -431,14 +435,24 @@ class AuditLogWindow:
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        # Calculate offset
+        # Calculate offset (for display only; paging seeks past the cursor)
         offset = (self.current_page - 1) * self.items_per_page
+        cursor = self.page_cursors[self.current_page - 1]
+        after_created_at, after_log_id = cursor if cursor else (None, None)
 
         # Get logs from database
         logs = self.db.search_audit_logs(
-            filters=self.filters, limit=self.items_per_page, offset=offset
+            filters=self.filters,
+            limit=self.items_per_page,
+            after_created_at=after_created_at,
+            after_log_id=after_log_id,
         )
 
+        # Remember where the next page starts
+        del self.page_cursors[self.current_page :]
+        if logs:
+            self.page_cursors.append((logs[-1]["created_at"], logs[-1]["log_id"]))
+
         # Get total count for pagination
         self.total_items = self.db.get_audit_log_count(self.filters)
 
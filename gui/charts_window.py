@@ -121,20 +121,12 @@ class ChartsWindow:
         """Display spending breakdown by category as a pie chart."""
         self.clear_chart_frame()
 
-        # Gather spending data from all accounts
-        category_totals = {}
+        # Gather spending data from all accounts in one query
+        categories, amounts = self.db.get_spending_matrix(
+            [account.account_id for account in self.accounts]
+        )
 
-        for account in self.accounts:
-            account_data = self.db.get_spending_by_category(account.account_id)
-            for row in account_data:
-                category = row["category"]
-                total = row["total"]
-                if category in category_totals:
-                    category_totals[category] += total
-                else:
-                    category_totals[category] = total
-
-        if not category_totals:
+        if not categories:
             self.show_no_data_message(
                 "No spending data available yet.\nMake some transactions to see your spending breakdown."
             )
@@ -144,9 +136,6 @@ class ChartsWindow:
         fig = Figure(figsize=(10, 6), facecolor=COLORS["bg_dark"])
         ax = fig.add_subplot(111, facecolor=COLORS["bg_dark"])
 
-        categories = list(category_totals.keys())
-        amounts = list(category_totals.values())
-
         # Vibrant colors for dark theme
         colors_list = [
             "#00ff88",
@@ -287,7 +276,7 @@ class ChartsWindow:
         monthly_data = {}
 
         for account in self.accounts:
-            transactions = self.db.get_transactions(account.account_id, limit=500)
+            transactions = self.db.iter_transactions(account.account_id, limit=500)
 
             for trans in transactions:
                 try:
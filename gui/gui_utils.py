@@ -59,8 +59,16 @@ FONTS = {
 
 
 def setup_dark_theme():
-    """Configure dark theme for the entire application."""
+    """
+    Configure dark theme for the entire application.
+
+    Styles are registered once per Tk interpreter; later calls return
+    without touching Tcl.
+    """
     style = ttk.Style()
+    if getattr(style.master, "_dark_theme_applied", False):
+        return
+    style.master._dark_theme_applied = True
 
     # Try to use a theme that works well with dark backgrounds
     try:
@@ -166,6 +174,22 @@ def setup_dark_theme():
         selectforeground=[("readonly", COLORS["text_primary"])],
     )
 
+    # Transaction history list
+    style.configure(
+        "History.Treeview",
+        background=COLORS["bg_dark"],
+        foreground=COLORS["text_primary"],
+        fieldbackground=COLORS["bg_dark"],
+        font=FONTS["monospace"],
+        borderwidth=0,
+    )
+    style.configure(
+        "History.Treeview.Heading",
+        background=COLORS["bg_medium"],
+        foreground=COLORS["text_bright"],
+        font=FONTS["small_bold"],
+    )
+
 
 def create_header_frame(
     parent: tk.Widget, title: str, subtitle: str = None, height: int = 120
@@ -357,6 +381,21 @@ def create_divider(parent: tk.Widget, text: str = "OR", pady: int = 20) -> tk.Fr
     return divider_frame
 
 
+def pack_all(widgets, **options) -> None:
+    """
+    Pack several widgets with the same options in a single Tcl call.
+
+    Equivalent to calling widget.pack(**options) on each widget in order.
+    """
+    widgets = list(widgets)
+    if not widgets:
+        return
+    args = []
+    for name, value in options.items():
+        args.extend(("-" + name, value))
+    widgets[0].tk.call("pack", *(str(widget) for widget in widgets), *args)
+
+
 def create_button_pair(
     parent: tk.Widget,
     primary_text: str,
@@ -1,8 +1,10 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
+from collections import deque
+from itertools import islice
 from datetime import datetime, timedelta
 from database.db_manager import DatabaseManager
-from models.account import create_account
+from models.account import create_account, Transaction
 from gui.gui_utils import (
     COLORS,
     FONTS,
@@ -11,9 +13,9 @@ from gui.gui_utils import (
     create_combobox,
     create_modal_dialog,
     create_button_pair,
+    pack_all,
     setup_dark_theme,
 )
-from gui.charts_window import ChartsWindow
 from gui.two_factor_setup_dialog import TwoFactorSetupDialog
 from gui.audit_log_window import AuditLogWindow
 from gui.transfer_dialog import TransferDialog
@@ -21,8 +23,35 @@ from gui.new_account_dialog import NewAccountDialog
 from utils.interest_scheduler import InterestScheduler
 from utils.session_manager import SessionManager
 from utils.audit_logger import AuditLogger
-from config import TRANSACTION_CATEGORIES, SecurityConfig
+from config import TRANSACTION_CATEGORIES, SecurityConfig, GUIConfig
 import csv
+import sys
+
+# Settings read on every refresh, resolved once at import
+_HISTORY_MAX = GUIConfig.HISTORY_MAX
+_REFRESH_DEBOUNCE_MS = GUIConfig.REFRESH_DEBOUNCE_MS
+_STATUS_CLEAR_MS = GUIConfig.STATUS_CLEAR_MS
+
+# Shared widget options, built once and reused for every widget that
+# takes them
+_HEADER_BUTTON_OPTIONS = {
+    "font": FONTS["tiny"],
+    "bd": 0,
+    "padx": 15,
+    "pady": 5,
+    "cursor": "hand2",
+}
+# Header buttons as (text, background, foreground, method name)
+_HEADER_BUTTONS = (
+    ("Logout", "accent_red", "text_bright", "logout"),
+    ("📊 Analytics", "accent_green", "bg_dark", "show_analytics"),
+    ("🔐 Security", "accent_purple", "text_bright", "show_security_settings"),
+)
+_CARD_TITLE_OPTIONS = {
+    "font": FONTS["subheading"],
+    "bg": COLORS["bg_card"],
+    "fg": COLORS["text_bright"],
+}
 
 
 class MainBankingWindow:
@@ -37,6 +66,13 @@ class MainBankingWindow:
         self.current_account = None
         self.accounts = []
 
+        # Incremental rendering state for the transaction history view
+        self._history_view = None
+        self._rendered_version = 0
+        self._history_items = []  # (item id, category) in history order
+        self._refresh_pending = False
+        self._status_clear_id = None
+
         # Initialize session manager
         self.session_manager = SessionManager(
             timeout_minutes=SecurityConfig.SESSION_TIMEOUT_MINUTES,
@@ -85,17 +121,20 @@ class MainBankingWindow:
                 acc_data["credit_limit"],
             )
             # Load transaction history
-            transactions = self.db.get_transactions(acc_data["account_id"], limit=50)
-            account.transaction_history = [
-                {
-                    "type": t["transaction_type"],
-                    "amount": t["amount"],
-                    "category": t["category"],
-                    "balance": t["balance_after"],
-                    "time": t["timestamp"],
-                }
-                for t in transactions
-            ]
+            transactions = self.db.iter_transactions(acc_data["account_id"], limit=50)
+            account.transaction_history = deque(
+                (
+                    Transaction(
+                        t["transaction_type"],
+                        t["amount"],
+                        t["category"],
+                        t["balance_after"],
+                        t["timestamp"],
+                    )
+                    for t in transactions
+                ),
+                maxlen=_HISTORY_MAX,
+            )
             self.accounts.append(account)
 
         if self.accounts:
@@ -299,9 +338,13 @@ class MainBankingWindow:
 
     def create_widgets(self):
         """Create main interface widgets with dark theme."""
+        # Outer layout: fixed-height header row above a stretching content row
+        self.root.grid_rowconfigure(1, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+
         # Header
         header_frame = tk.Frame(self.root, bg=COLORS["bg_medium"], height=80)
-        header_frame.pack(fill=tk.X)
+        header_frame.grid(row=0, column=0, sticky="ew")
         header_frame.pack_propagate(False)
 
         # Left side - Logo
@@ -327,64 +370,39 @@ class MainBankingWindow:
         )
         welcome_label.pack(anchor=tk.E)
 
-        logout_btn = tk.Button(
-            user_frame,
-            text="Logout",
-            font=FONTS["tiny"],
-            bg=COLORS["accent_red"],
-            fg=COLORS["text_bright"],
-            bd=0,
-            padx=15,
-            pady=5,
-            cursor="hand2",
-            command=self.logout,
-        )
-        logout_btn.pack(anchor=tk.E, pady=(5, 0))
-
-        # Analytics button
-        analytics_btn = tk.Button(
-            user_frame,
-            text="📊 Analytics",
-            font=FONTS["tiny"],
-            bg=COLORS["accent_green"],
-            fg=COLORS["bg_dark"],
-            bd=0,
-            padx=15,
-            pady=5,
-            cursor="hand2",
-            command=self.show_analytics,
-        )
-        analytics_btn.pack(anchor=tk.E, pady=(5, 0))
-
-        # 2FA Security Settings button
-        security_btn = tk.Button(
-            user_frame,
-            text="🔐 Security",
-            font=FONTS["tiny"],
-            bg=COLORS["accent_purple"] if "accent_purple" in COLORS else "#9b59b6",
-            fg=COLORS["text_bright"],
-            bd=0,
-            padx=15,
-            pady=5,
-            cursor="hand2",
-            command=self.show_security_settings,
+        # Header buttons: logout, analytics and 2FA security settings
+        pack_all(
+            (
+                tk.Button(
+                    user_frame,
+                    text=text,
+                    bg=COLORS[bg_key],
+                    fg=COLORS[fg_key],
+                    command=getattr(self, command),
+                    **_HEADER_BUTTON_OPTIONS,
+                )
+                for text, bg_key, fg_key, command in _HEADER_BUTTONS
+            ),
+            anchor=tk.E,
+            pady=(5, 0),
         )
-        security_btn.pack(anchor=tk.E, pady=(5, 0))
 
         # Main content area
         content_frame = tk.Frame(self.root, bg=COLORS["bg_dark"])
-        content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        content_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=20)
+        content_frame.grid_rowconfigure(0, weight=1)
+        content_frame.grid_columnconfigure(1, weight=1)
 
         # Left panel - Account selection and info
         left_panel = tk.Frame(content_frame, bg=COLORS["bg_card"], width=280)
-        left_panel.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+        left_panel.grid(row=0, column=0, sticky="ns", padx=(0, 10))
         left_panel.pack_propagate(False)
 
         self.create_left_panel(left_panel)
 
         # Right panel - Transactions
         right_panel = tk.Frame(content_frame, bg=COLORS["bg_card"])
-        right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        right_panel.grid(row=0, column=1, sticky="nsew")
 
         self.create_right_panel(right_panel)
 
@@ -394,9 +412,7 @@ class MainBankingWindow:
         account_label = tk.Label(
             parent,
             text="My Accounts",
-            font=FONTS["subheading"],
-            bg=COLORS["bg_card"],
-            fg=COLORS["text_bright"],
+            **_CARD_TITLE_OPTIONS,
         )
         account_label.pack(padx=15, pady=(15, 10), anchor=tk.W)
 
@@ -554,6 +570,18 @@ class MainBankingWindow:
         )
         self.interest_button.pack_forget()  # Hide by default
 
+        # Transaction status (replaces blocking message boxes)
+        self.status_label = tk.Label(
+            parent,
+            text="",
+            font=FONTS["tiny"],
+            bg=COLORS["bg_card"],
+            fg=COLORS["success"],
+            wraplength=250,
+            justify=tk.LEFT,
+        )
+        self.status_label.pack(padx=15, anchor=tk.W)
+
         self.update_account_display()
 
     def create_right_panel(self, parent):
@@ -565,9 +593,7 @@ class MainBankingWindow:
         history_title = tk.Label(
             header_frame,
             text="Transaction History",
-            font=FONTS["subheading"],
-            bg=COLORS["bg_card"],
-            fg=COLORS["text_bright"],
+            **_CARD_TITLE_OPTIONS,
         )
         history_title.pack(side=tk.LEFT)
 
@@ -598,7 +624,7 @@ class MainBankingWindow:
         )
         filter_label.pack(side=tk.LEFT, padx=(0, 10))
 
-        filter_options = ["All"] + TRANSACTION_CATEGORIES
+        filter_options = ("All",) + TRANSACTION_CATEGORIES
         self.filter_var, filter_dropdown = create_combobox(
             filter_frame, filter_options, default="All", width=15, side=tk.LEFT
         )
@@ -613,23 +639,34 @@ class MainBankingWindow:
         scrollbar = tk.Scrollbar(list_frame)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        self.history_text = tk.Text(
+        columns = ("time", "type", "category", "amount", "balance")
+        self.history_tree = ttk.Treeview(
             list_frame,
-            font=FONTS["monospace"],
-            bg=COLORS["bg_dark"],
-            fg=COLORS["text_primary"],
-            insertbackground=COLORS["accent_blue"],
-            bd=1,
-            relief=tk.SOLID,
-            highlightthickness=1,
-            highlightbackground=COLORS["border"],
-            highlightcolor=COLORS["focus"],
+            columns=columns,
+            show="headings",
+            style="History.Treeview",
             yscrollcommand=scrollbar.set,
-            state=tk.DISABLED,
-            wrap=tk.WORD,
         )
-        self.history_text.pack(fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.history_text.yview)
+
+        self.history_tree.heading("time", text="Date & Time")
+        self.history_tree.heading("type", text="Type")
+        self.history_tree.heading("category", text="Category")
+        self.history_tree.heading("amount", text="Amount")
+        self.history_tree.heading("balance", text="Balance")
+
+        self.history_tree.column("time", width=150, minwidth=150)
+        self.history_tree.column("type", width=110, minwidth=100)
+        self.history_tree.column("category", width=130, minwidth=110)
+        self.history_tree.column("amount", width=90, minwidth=80, anchor=tk.E)
+        self.history_tree.column("balance", width=100, minwidth=90, anchor=tk.E)
+
+        self.history_tree.pack(fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.history_tree.yview)
+
+        # Placeholder row, attached only when nothing matches the filter
+        self.history_tree.insert(
+            "", tk.END, iid="empty", values=("No transactions found.",)
+        )
 
         self.update_transaction_history()
 
@@ -655,6 +692,26 @@ class MainBankingWindow:
         self.update_account_display()
         self.update_transaction_history()
 
+    def refresh_display(self):
+        """
+        Schedule a refresh of the balance and transaction history.
+
+        Calls arriving within GUIConfig.REFRESH_DEBOUNCE_MS of each other are
+        coalesced into a single redraw.
+        """
+        if self._refresh_pending:
+            return
+        self._refresh_pending = True
+        self.root.after(_REFRESH_DEBOUNCE_MS, self._flush_display)
+
+    def _flush_display(self):
+        """Run a scheduled display refresh."""
+        self._refresh_pending = False
+        if self.is_logged_out:
+            return
+        self.update_account_display()
+        self.update_transaction_history()
+
     def update_account_display(self):
         """Update balance and account info display."""
         if not self.current_account:
@@ -674,7 +731,7 @@ class MainBankingWindow:
                 # Get last interest date from database
                 account_data = self.db.get_account(self.current_account.account_id)
                 last_interest = (
-                    account_data.get("last_interest_date") if account_data else None
+                    account_data["last_interest_date"] if account_data else None
                 )
 
                 # Check if interest should be applied
@@ -714,41 +771,78 @@ class MainBankingWindow:
         self.account_type_label.config(text=info_text)
 
     def update_transaction_history(self):
-        """Update transaction history display."""
+        """
+        Update transaction history display.
+
+        Every transaction of the current account is kept as a Treeview item.
+        Refreshes only insert rows appended since the last render and drop
+        rows evicted from the bounded history; filtering re-attaches the
+        matching items with a single set_children call.
+        """
         if not self.current_account:
             return
 
-        self.history_text.config(state=tk.NORMAL)
-        self.history_text.delete(1.0, tk.END)
+        filter_category = sys.intern(self.filter_var.get())
+        history = self.current_account.transaction_history
+        version = self.current_account.history_version
+        new_count = version - self._rendered_version
+        items = self._history_items
 
-        filter_category = self.filter_var.get()
-        transactions = self.current_account.transaction_history
+        same_view = (
+            self._history_view is not None
+            and self._history_view[0] is self.current_account
+            and self._history_view[1] is history
+        )
 
-        # Filter transactions
-        if filter_category != "All":
-            transactions = [
-                t for t in transactions if t.get("category") == filter_category
-            ]
+        if not same_view or new_count > len(history):
+            # Different account (or more new rows than the history holds)
+            if items:
+                self.history_tree.delete(*(iid for iid, _ in items))
+            items.clear()
+            new_count = len(history)
+
+        if new_count:
+            # Drop rows the bounded history has already evicted
+            evicted = len(items) + new_count - len(history)
+            if evicted > 0:
+                self.history_tree.delete(*(iid for iid, _ in items[:evicted]))
+                del items[:evicted]
+
+            # Append only what arrived since the last render, walking the
+            # deque from its tail instead of copying the whole history
+            new_transactions = list(islice(reversed(history), new_count))
+            for trans in reversed(new_transactions):
+                iid = self.history_tree.insert("", tk.END, values=trans.row)
+                items.append((iid, trans.category))
+
+        # Attach the rows matching the filter in one call
+        if filter_category == "All":
+            visible = [iid for iid, _ in items]
+        else:
+            visible = [iid for iid, category in items if category == filter_category]
+        self.history_tree.set_children("", *(visible or ["empty"]))
 
-        if transactions:
-            # Header
-            header = f"{'Date & Time':<20} {'Type':<15} {'Category':<18} {'Amount':>10} {'Balance':>12}\n"
-            self.history_text.insert(tk.END, header)
-            self.history_text.insert(tk.END, "-" * 85 + "\n")
+        self._history_view = (self.current_account, history)
+        self._rendered_version = version
 
-            for trans in transactions:
-                category = trans.get("category", "N/A") or "N/A"
-                line = f"{trans['time']:<20} {trans['type']:<15} {category:<18} ${trans['amount']:>9.2f} ${trans['balance']:>11.2f}\n"
-                self.history_text.insert(tk.END, line)
-        else:
-            self.history_text.insert(tk.END, "No transactions found.")
+    def show_status(self, message, success=True):
+        """Show a transaction result in the status line and clear it later."""
+        self.status_label.config(
+            text=message, fg=COLORS["success"] if success else COLORS["error"]
+        )
+        if self._status_clear_id:
+            self.root.after_cancel(self._status_clear_id)
+        self._status_clear_id = self.root.after(_STATUS_CLEAR_MS, self._clear_status)
 
-        self.history_text.config(state=tk.DISABLED)
+    def _clear_status(self):
+        """Clear the status line."""
+        self._status_clear_id = None
+        self.status_label.config(text="")
 
     def deposit_money(self):
         """Handle deposit transaction."""
         if not self.current_account:
-            messagebox.showerror("Error", "No account selected.")
+            self.show_status("No account selected.", success=False)
             return
 
         try:
@@ -758,18 +852,19 @@ class MainBankingWindow:
             success, message = self.current_account.deposit(amount, category)
 
             if success:
-                # Update database
-                self.db.update_balance(
-                    self.current_account.account_id, self.current_account.balance
-                )
-                self.db.add_transaction(
-                    self.current_account.account_id,
-                    "Deposit",
-                    amount,
-                    f"Deposit - {category}",
-                    self.current_account.balance,
-                    category,
-                )
+                # Update database in one commit
+                with self.db.transaction():
+                    self.db.update_balance(
+                        self.current_account.account_id, self.current_account.balance
+                    )
+                    self.db.add_transaction(
+                        self.current_account.account_id,
+                        "Deposit",
+                        amount,
+                        f"Deposit - {category}",
+                        self.current_account.balance,
+                        category,
+                    )
 
                 # Log the transaction
                 self.audit_logger.log_transaction(
@@ -783,19 +878,18 @@ class MainBankingWindow:
                     },
                 )
 
-                messagebox.showinfo("Success", message)
+                self.show_status(message)
                 self.amount_entry.delete(0, tk.END)
-                self.update_account_display()
-                self.update_transaction_history()
+                self.refresh_display()
             else:
-                messagebox.showerror("Error", message)
+                self.show_status(message, success=False)
         except ValueError:
-            messagebox.showerror("Error", "Please enter a valid numeric amount.")
+            self.show_status("Please enter a valid numeric amount.", success=False)
 
     def withdraw_money(self):
         """Handle withdrawal transaction."""
         if not self.current_account:
-            messagebox.showerror("Error", "No account selected.")
+            self.show_status("No account selected.", success=False)
             return
 
         try:
@@ -805,18 +899,19 @@ class MainBankingWindow:
             success, message = self.current_account.withdraw(amount, category)
 
             if success:
-                # Update database
-                self.db.update_balance(
-                    self.current_account.account_id, self.current_account.balance
-                )
-                self.db.add_transaction(
-                    self.current_account.account_id,
-                    "Withdrawal",
-                    amount,
-                    f"Withdrawal - {category}",
-                    self.current_account.balance,
-                    category,
-                )
+                # Update database in one commit
+                with self.db.transaction():
+                    self.db.update_balance(
+                        self.current_account.account_id, self.current_account.balance
+                    )
+                    self.db.add_transaction(
+                        self.current_account.account_id,
+                        "Withdrawal",
+                        amount,
+                        f"Withdrawal - {category}",
+                        self.current_account.balance,
+                        category,
+                    )
 
                 # Log the transaction
                 self.audit_logger.log_transaction(
@@ -830,14 +925,13 @@ class MainBankingWindow:
                     },
                 )
 
-                messagebox.showinfo("Success", message)
+                self.show_status(message)
                 self.amount_entry.delete(0, tk.END)
-                self.update_account_display()
-                self.update_transaction_history()
+                self.refresh_display()
             else:
-                messagebox.showerror("Error", message)
+                self.show_status(message, success=False)
         except ValueError:
-            messagebox.showerror("Error", "Please enter a valid numeric amount.")
+            self.show_status("Please enter a valid numeric amount.", success=False)
 
     def transfer_money(self):
         """Handle transfer between accounts."""
@@ -867,7 +961,7 @@ class MainBankingWindow:
 
         # Get account data from database
         account_data = self.db.get_account(self.current_account.account_id)
-        last_interest = account_data.get("last_interest_date") if account_data else None
+        last_interest = account_data["last_interest_date"] if account_data else None
 
         # Calculate days since last interest
         if last_interest:
@@ -915,8 +1009,7 @@ class MainBankingWindow:
                     self.current_account = acc
                     break
 
-        self.update_account_display()
-        self.update_transaction_history()
+        self.refresh_display()
 
     def create_new_account(self):
         """Show dialog to create new account."""
@@ -940,8 +1033,7 @@ class MainBankingWindow:
             self.current_account = self.accounts[-1]
 
         # Update displays
-        self.update_account_display()
-        self.update_transaction_history()
+        self.refresh_display()
 
     def delete_current_account(self):
         """Delete the currently selected account."""
@@ -992,8 +1084,7 @@ class MainBankingWindow:
                 self.account_dropdown["values"] = account_names
                 self.account_var.set(account_names[0])
                 self.current_account = self.accounts[0]
-                self.update_account_display()
-                self.update_transaction_history()
+                self.refresh_display()
             else:
                 # No accounts left (shouldn't happen due to check above)
                 self.current_account = None
@@ -1024,11 +1115,11 @@ class MainBankingWindow:
                     for trans in self.current_account.transaction_history:
                         writer.writerow(
                             [
-                                trans["time"],
-                                trans["type"],
-                                trans.get("category", "N/A"),
-                                f"${trans['amount']:.2f}",
-                                f"${trans['balance']:.2f}",
+                                trans.time,
+                                trans.type,
+                                trans.category,
+                                f"${trans.amount:.2f}",
+                                f"${trans.balance:.2f}",
                             ]
                         )
 
@@ -1073,6 +1164,9 @@ class MainBankingWindow:
 
     def show_analytics(self):
         """Open analytics dashboard window."""
+        # Imported on first use so matplotlib is not loaded at startup
+        from gui.charts_window import ChartsWindow
+
         ChartsWindow(self.root, self.user_id, self.db, self.accounts)
 
     def show_security_settings(self):
@@ -1141,7 +1235,7 @@ class MainBankingWindow:
         status_label.pack(anchor=tk.W)
 
         if is_enabled and status:
-            backup_codes_remaining = len(status.get("backup_codes", []))
+            backup_codes_remaining = status["backup_codes_remaining"]
             backup_label = tk.Label(
                 status_frame,
                 text=f"Backup codes remaining: {backup_codes_remaining}",
@@ -250,28 +250,19 @@ class TwoFactorVerificationDialog:
 
     def _verify_backup_code(self, code: str) -> None:
         """Verify backup code."""
-        # Get backup codes
-        backup_codes = self.db.get_backup_codes(self.user_id)
-
-        if not backup_codes:
+        if not self.db.get_backup_code_count(self.user_id):
             self._show_error("No backup codes found for this account.")
             return
 
-        # Verify the backup code
-        is_valid, used_code = self.totp_manager.verify_backup_code(code, backup_codes)
-
-        if is_valid:
-            # Mark code as used
-            success, message = self.db.use_backup_code(self.user_id, used_code)
+        # Verify the backup code and mark it as used
+        success, message = self.db.use_backup_code(self.user_id, code)
 
-            if success:
-                self.status_label.config(
-                    text=f"✓ Backup code accepted!\n{message}", foreground="#95e1d3"
-                )
-                self.result = True
-                self.dialog.after(1000, self._close_dialog)
-            else:
-                self._show_error(f"Error using backup code: {message}")
+        if success:
+            self.status_label.config(
+                text=f"✓ Backup code accepted!\n{message}", foreground="#95e1d3"
+            )
+            self.result = True
+            self.dialog.after(1000, self._close_dialog)
         else:
             self._handle_failed_attempt("Invalid backup code. Please try again.")
 
@@ -316,8 +307,8 @@ class TwoFactorVerificationDialog:
         self.status_label.config(text="", foreground="#cccccc")
 
         # Check if backup codes are available
-        backup_codes = self.db.get_backup_codes(self.user_id)
-        if not backup_codes:
+        remaining = self.db.get_backup_code_count(self.user_id)
+        if not remaining:
             self.status_label.config(
                 text="⚠️ No backup codes available. Please use your authenticator app.",
                 foreground="#ffa500",
@@ -326,7 +317,7 @@ class TwoFactorVerificationDialog:
             self.verify_btn.config(state=tk.DISABLED)
         else:
             self.status_label.config(
-                text=f"{len(backup_codes)} backup code(s) remaining",
+                text=f"{remaining} backup code(s) remaining",
                 foreground="#4ecdc4",
             )
 
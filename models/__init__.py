@@ -5,6 +5,7 @@ from .account import (
     SavingsAccount,
     CreditAccount,
     create_account,
+    Transaction,
 )
 
 __all__ = [
@@ -13,4 +14,5 @@ __all__ = [
     "SavingsAccount",
     "CreditAccount",
     "create_account",
+    "Transaction",
 ]
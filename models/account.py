@@ -1,11 +1,96 @@
+import sys
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Tuple, List, Dict
+from collections import deque
+from itertools import accumulate
+from typing import Deque, Iterable, Tuple
+from config import GUIConfig
+
+# Resolved once at import; read on every account and recorded transaction
+_DATE_FORMAT = GUIConfig.DATE_FORMAT
+_HISTORY_MAX = GUIConfig.HISTORY_MAX
+
+# Last formatted timestamp, keyed by the wall-clock second it was taken in
+_timestamp_cache = [0, ""]
+
+
+def _now_str() -> str:
+    """
+    Get the current local time formatted with DATE_FORMAT.
+
+    The formatted string is reused for every call within the same second.
+    """
+    now = int(time.time())
+    if _timestamp_cache[0] != now:
+        _timestamp_cache[0] = now
+        _timestamp_cache[1] = time.strftime(_DATE_FORMAT, time.localtime(now))
+    return _timestamp_cache[1]
+
+
+def to_cents(amount: float) -> int:
+    """Convert a dollar amount to integer cents."""
+    return int(round(amount * 100))
+
+
+def format_cents(cents: int) -> str:
+    """Format integer cents as a dollar amount with two decimals (no symbol)."""
+    dollars, remainder = divmod(abs(cents), 100)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{dollars}.{remainder:02d}"
+
+
+def format_transaction_row(
+    transaction: "Transaction",
+) -> Tuple[str, str, str, str, str]:
+    """Format a transaction as display values for the transaction history view."""
+    return (
+        transaction.time,
+        transaction.type,
+        transaction.category or "N/A",
+        f"${transaction.amount:.2f}",
+        f"${transaction.balance:.2f}",
+    )
+
+
+class Transaction:
+    """A recorded transaction with its display row pre-formatted."""
+
+    __slots__ = ("type", "amount", "category", "balance", "time", "row")
+
+    def __init__(
+        self,
+        transaction_type: str,
+        amount: float,
+        category: str,
+        balance: float,
+        time: str,
+    ):
+        self.type = sys.intern(transaction_type)
+        self.amount = amount
+        self.category = sys.intern(category) if category else category
+        self.balance = balance
+        self.time = time
+        self.row = format_transaction_row(self)
+
+    def __getitem__(self, key: str):
+        """Allow dict-style access to fields for existing callers."""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        """Return a field by name, or default if there is no such field."""
+        return getattr(self, key, default)
 
 
 class Account(ABC):
     """Abstract base class for all account types."""
 
+    # Transaction types recorded by apply_bulk for credits and debits
+    BULK_CREDIT_TYPE = "Deposit"
+    BULK_DEBIT_TYPE = "Withdrawal"
+
     def __init__(
         self,
         account_id: int,
@@ -16,57 +101,122 @@ class Account(ABC):
         self.account_id = account_id
         self.account_number = account_number
         self.account_holder = account_holder
-        self._balance = balance
-        self.transaction_history: List[Dict] = []
+        self._balance_cents = to_cents(balance)
+        self.transaction_history: Deque[Transaction] = deque(maxlen=_HISTORY_MAX)
+        self.history_version = 0  # Incremented on every recorded transaction
 
     @property
     def balance(self) -> float:
         """Get current balance."""
-        return self._balance
+        return self._balance_cents / 100
 
     @balance.setter
     def balance(self, value: float):
         """Set balance."""
-        self._balance = value
+        self._balance_cents = to_cents(value)
+
+    @property
+    def _balance(self) -> float:
+        """Balance in dollars, derived from the integer cents value."""
+        return self._balance_cents / 100
 
     def deposit(self, amount: float, category: str = None) -> Tuple[bool, str]:
         """Deposit money into account."""
         if amount <= 0:
             return False, "Deposit amount must be positive."
 
-        self._balance += amount
-        self._record_transaction("Deposit", amount, category)
-        return True, f"Deposited ${amount:.2f}. New balance: ${self._balance:.2f}"
+        self._apply_transaction("Deposit", amount, category)
+        return True, f"Deposited ${amount:.2f}. New balance: ${format_cents(self._balance_cents)}"
 
     @abstractmethod
     def withdraw(self, amount: float, category: str = None) -> Tuple[bool, str]:
         """Withdraw money from account. Must be implemented by subclasses."""
         pass
 
+    def apply_bulk(
+        self, amounts: Iterable[float], category: str = None
+    ) -> Tuple[bool, str]:
+        """
+        Apply a batch of signed amounts in one pass.
+
+        Positive amounts are credits and negative amounts are debits. The
+        running balance is computed with integer cents up front, and the
+        batch is rejected as a whole if any point would fall below the
+        account's lowest allowed balance.
+        """
+        cents = [to_cents(amount) for amount in amounts]
+        if not cents:
+            return False, "No transactions to apply."
+        if 0 in cents:
+            return False, "Transaction amounts must be non-zero."
+
+        balances = list(accumulate(cents, initial=self._balance_cents))[1:]
+        if min(balances) < to_cents(self.get_lowest_allowed_balance()):
+            return False, "Batch would exceed the account's balance limits."
+
+        self._balance_cents = balances[-1]
+        timestamp = _now_str()
+        self.transaction_history.extend(
+            Transaction(
+                self.BULK_CREDIT_TYPE if change > 0 else self.BULK_DEBIT_TYPE,
+                abs(change) / 100,
+                category,
+                balance / 100,
+                timestamp,
+            )
+            for change, balance in zip(cents, balances)
+        )
+        self.history_version += len(cents)
+
+        return True, (
+            f"Applied {len(cents)} transactions. "
+            f"New balance: ${format_cents(self._balance_cents)}"
+        )
+
+    def get_lowest_allowed_balance(self) -> float:
+        """Get the lowest balance the account may reach."""
+        return 0
+
+    def _apply_transaction(
+        self,
+        transaction_type: str,
+        amount: float,
+        category: str = None,
+        debit: bool = False,
+    ):
+        """Apply an amount to the balance and record it in history."""
+        cents = to_cents(amount)
+        if debit:
+            self._balance_cents -= cents
+        else:
+            self._balance_cents += cents
+        self._record_transaction(transaction_type, cents / 100, category)
+
     def _record_transaction(
         self, transaction_type: str, amount: float, category: str = None
     ):
         """Record a transaction in history."""
         self.transaction_history.append(
-            {
-                "type": transaction_type,
-                "amount": amount,
-                "category": category,
-                "balance": self._balance,
-                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
+            Transaction(
+                transaction_type,
+                amount,
+                category,
+                self._balance,
+                _now_str(),
+            )
         )
+        self.history_version += 1
 
     def get_balance_formatted(self) -> str:
         """Get formatted balance string."""
-        return f"${self._balance:.2f}"
+        return f"${format_cents(self._balance_cents)}"
 
     def get_account_type(self) -> str:
         """Get account type name."""
         return self.__class__.__name__
 
     def __str__(self):
-        return f"{self.get_account_type()} - {self.account_number} - Balance: ${self._balance:.2f}"
+        return f"{self.get_account_type()} - {self.account_number} - Balance: ${format_cents(self._balance_cents)}"
 
 
 class CheckingAccount(Account):
@@ -95,16 +245,20 @@ class CheckingAccount(Account):
                 f"Insufficient funds. Overdraft limit: ${self.overdraft_limit:.2f}",
             )
 
-        self._balance -= amount
-        self._record_transaction("Withdrawal", amount, category)
+        self._apply_transaction("Withdrawal", amount, category, debit=True)
 
-        if self._balance < 0:
+        balance = format_cents(self._balance_cents)
+        if self._balance_cents < 0:
             return (
                 True,
-                f"Withdrew ${amount:.2f}. Warning: Overdraft balance: ${self._balance:.2f}",
+                f"Withdrew ${amount:.2f}. Warning: Overdraft balance: ${balance}",
             )
 
-        return True, f"Withdrew ${amount:.2f}. New balance: ${self._balance:.2f}"
+        return True, f"Withdrew ${amount:.2f}. New balance: ${balance}"
+
+    def get_lowest_allowed_balance(self) -> float:
+        """Get the lowest balance the account may reach."""
+        return -self.overdraft_limit
 
     def get_available_balance(self) -> float:
         """Get available balance including overdraft."""
@@ -148,16 +302,36 @@ class SavingsAccount(Account):
                 f"Withdrawal would violate minimum balance of ${self.minimum_balance:.2f}",
             )
 
-        self._balance -= amount
+        self._apply_transaction("Withdrawal", amount, category, debit=True)
         self.withdrawal_count += 1
-        self._record_transaction("Withdrawal", amount, category)
 
         remaining_withdrawals = self.monthly_withdrawal_limit - self.withdrawal_count
         return True, (
-            f"Withdrew ${amount:.2f}. New balance: ${self._balance:.2f}\n"
+            f"Withdrew ${amount:.2f}. New balance: ${format_cents(self._balance_cents)}\n"
             f"Remaining withdrawals this month: {remaining_withdrawals}"
         )
 
+    def apply_bulk(
+        self, amounts: Iterable[float], category: str = None
+    ) -> Tuple[bool, str]:
+        """Apply a batch of signed amounts, counting debits as withdrawals."""
+        amounts = list(amounts)
+        withdrawals = sum(1 for amount in amounts if amount < 0)
+        if self.withdrawal_count + withdrawals > self.monthly_withdrawal_limit:
+            return (
+                False,
+                f"Monthly withdrawal limit ({self.monthly_withdrawal_limit}) reached.",
+            )
+
+        success, message = super().apply_bulk(amounts, category)
+        if success:
+            self.withdrawal_count += withdrawals
+        return success, message
+
+    def get_lowest_allowed_balance(self) -> float:
+        """Get the lowest balance the account may reach."""
+        return self.minimum_balance
+
     def calculate_interest(self, days: int = 30) -> float:
         """Calculate interest for specified number of days."""
         daily_rate = self.interest_rate / 365
@@ -168,11 +342,10 @@ class SavingsAccount(Account):
         """Apply interest to account."""
         interest = self.calculate_interest(days)
         if interest > 0:
-            self._balance += interest
-            self._record_transaction("Interest", interest, "Interest")
+            self._apply_transaction("Interest", interest, "Interest")
             return (
                 True,
-                f"Interest applied: ${interest:.2f}. New balance: ${self._balance:.2f}",
+                f"Interest applied: ${interest:.2f}. New balance: ${format_cents(self._balance_cents)}",
             )
         return False, "No interest to apply."
 
@@ -184,6 +357,9 @@ class SavingsAccount(Account):
 class CreditAccount(Account):
     """Credit account with credit limit and interest on borrowed amounts."""
 
+    BULK_CREDIT_TYPE = "Payment"
+    BULK_DEBIT_TYPE = "Credit Purchase"
+
     def __init__(
         self,
         account_id: int,
@@ -204,16 +380,17 @@ class CreditAccount(Account):
             return False, "Amount must be positive."
 
         # Check if withdrawal would exceed credit limit
-        if abs(self._balance - amount) > self.credit_limit:
-            available = self.credit_limit - abs(self._balance)
+        balance = self._balance
+        if abs(balance - amount) > self.credit_limit:
+            available = self.credit_limit - abs(balance)
             return False, f"Exceeds credit limit. Available credit: ${available:.2f}"
 
-        self._balance -= amount
-        self._record_transaction("Credit Purchase", amount, category)
+        self._apply_transaction("Credit Purchase", amount, category, debit=True)
 
         available_credit = self.credit_limit - abs(self._balance)
         return True, (
-            f"Charged ${amount:.2f}. Current balance: ${self._balance:.2f}\n"
+            f"Charged ${amount:.2f}. "
+            f"Current balance: ${format_cents(self._balance_cents)}\n"
             f"Available credit: ${available_credit:.2f}"
         )
 
@@ -222,22 +399,28 @@ class CreditAccount(Account):
         if amount <= 0:
             return False, "Payment amount must be positive."
 
-        self._balance += amount
-        self._record_transaction("Payment", amount, category)
+        self._apply_transaction("Payment", amount, category)
 
-        if self._balance > 0:
+        balance = self._balance_cents
+        if balance > 0:
             return (
                 True,
-                f"Payment received: ${amount:.2f}. Credit balance: ${abs(self._balance):.2f} (overpaid)",
+                f"Payment received: ${amount:.2f}. "
+                f"Credit balance: ${format_cents(balance)} (overpaid)",
             )
-        elif self._balance == 0:
+        elif balance == 0:
             return True, f"Payment received: ${amount:.2f}. Account paid in full!"
         else:
             return (
                 True,
-                f"Payment received: ${amount:.2f}. Remaining balance: ${abs(self._balance):.2f}",
+                f"Payment received: ${amount:.2f}. "
+                f"Remaining balance: ${format_cents(-balance)}",
             )
 
+    def get_lowest_allowed_balance(self) -> float:
+        """Get the lowest balance the account may reach."""
+        return -self.credit_limit
+
     def get_available_credit(self) -> float:
         """Get available credit."""
         return self.credit_limit - abs(self._balance)
@@ -255,11 +438,12 @@ class CreditAccount(Account):
         """Apply interest charges to outstanding balance."""
         interest = self.calculate_interest(days)
         if interest > 0:
-            self._balance -= interest  # Increase debt
-            self._record_transaction("Interest Charge", interest, "Interest")
+            self._apply_transaction(
+                "Interest Charge", interest, "Interest", debit=True
+            )
             return (
                 True,
-                f"Interest charged: ${interest:.2f}. New balance: ${self._balance:.2f}",
+                f"Interest charged: ${interest:.2f}. New balance: ${format_cents(self._balance_cents)}",
             )
         return False, "No interest charges."
 
@@ -267,7 +451,7 @@ class CreditAccount(Account):
         """Get formatted balance string."""
         if self._balance < 0:
             return f"-${abs(self._balance):.2f}"
-        return f"${self._balance:.2f}"
+        return f"${format_cents(self._balance_cents)}"
 
 
 def create_account(
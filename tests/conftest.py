@@ -6,8 +6,16 @@ Provides reusable test fixtures for database, accounts, and test data
 import pytest
 import os
 import tempfile
-from database.db_manager import DatabaseManager
-from models.account import CheckingAccount, SavingsAccount, CreditAccount
+
+# Use the minimum bcrypt work factor so password hashing does not dominate
+# test time. SecurityConfig reads these when config is first imported, and
+# the imports below are what import it, so they must come after (a
+# pytest_configure hook would run too late, after this module is loaded)
+os.environ.setdefault("MORESTACKS_BCRYPT_COST", "4")
+os.environ.setdefault("MORESTACKS_BCRYPT_MIN_COST", "4")
+
+from database.db_manager import DatabaseManager  # noqa: E402
+from models.account import CheckingAccount, SavingsAccount, CreditAccount  # noqa: E402
 
 
 @pytest.fixture
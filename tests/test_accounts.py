@@ -10,6 +10,7 @@ from models.account import (
     CreditAccount,
     create_account,
 )
+from config import GUIConfig
 
 
 class TestCheckingAccount:
@@ -102,6 +103,23 @@ class TestCheckingAccount:
         assert checking_account.transaction_history[0]["type"] == "Deposit"
         assert checking_account.transaction_history[1]["type"] == "Withdrawal"
 
+    @pytest.mark.unit
+    def test_transaction_history_is_bounded(self, checking_account):
+        """Test transaction history keeps only the most recent entries."""
+        for _ in range(GUIConfig.HISTORY_MAX + 5):
+            checking_account.deposit(1.0)
+
+        assert len(checking_account.transaction_history) == GUIConfig.HISTORY_MAX
+        assert checking_account.history_version == GUIConfig.HISTORY_MAX + 5
+
+    @pytest.mark.unit
+    def test_transaction_history_row_preformatted(self, checking_account):
+        """Test history entries carry their display values."""
+        checking_account.deposit(200.0, "Shopping")
+
+        row = checking_account.transaction_history[-1].row
+        assert row[1:] == ("Deposit", "Shopping", "$200.00", "$1200.00")
+
     @pytest.mark.unit
     def test_balance_property(self, checking_account):
         """Test balance property getter and setter."""
@@ -114,6 +132,30 @@ class TestCheckingAccount:
         formatted = checking_account.get_balance_formatted()
         assert formatted == "$1000.00"  # No comma formatting
 
+    @pytest.mark.unit
+    def test_apply_bulk(self, checking_account):
+        """Test applying a batch of deposits and withdrawals."""
+        success, message = checking_account.apply_bulk([100.0, -250.5, 20.25])
+
+        assert success is True
+        assert checking_account.balance == 869.75
+        assert [t.type for t in checking_account.transaction_history] == [
+            "Deposit",
+            "Withdrawal",
+            "Deposit",
+        ]
+        assert checking_account.transaction_history[1].balance == 849.5
+        assert checking_account.history_version == 3
+
+    @pytest.mark.unit
+    def test_apply_bulk_rejects_overdraft(self, checking_account):
+        """Test a batch that would pass the overdraft limit is not applied."""
+        success, message = checking_account.apply_bulk([-1400.0, -200.0, 500.0])
+
+        assert success is False
+        assert checking_account.balance == 1000.0
+        assert len(checking_account.transaction_history) == 0
+
 
 class TestSavingsAccount:
     """Test suite for SavingsAccount class."""
@@ -358,3 +400,12 @@ class TestAccountEdgeCases:
 
         # Should be 1000.3, not 1000.30000000004
         assert checking_account.balance == pytest.approx(1000.3, rel=1e-9)
+
+    @pytest.mark.unit
+    def test_balance_kept_in_whole_cents(self, checking_account):
+        """Test repeated fractional deposits do not drift."""
+        for _ in range(10):
+            checking_account.deposit(0.1)
+
+        assert checking_account.balance == 1001.0
+        assert checking_account.get_balance_formatted() == "$1001.00"
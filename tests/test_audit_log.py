@@ -11,8 +11,11 @@ Tests cover:
 
 import pytest
 import os
+import sqlite3
 import tempfile
+import time
 from datetime import datetime, timedelta
+from database import db_manager
 from database.db_manager import DatabaseManager
 from utils.audit_logger import AuditLogger, AuditSeverity, AuditCategory, AuditEventType
 from utils.audit_retention import AuditRetentionPolicy
@@ -301,6 +304,75 @@ class TestDatabaseAuditMethods:
         )
         assert success is True
 
+    def test_create_audit_log_batches_bursts(self, db):
+        """Test a burst of audit events is written with few commits."""
+        statements = []
+        db.conn.set_trace_callback(statements.append)
+        for i in range(50):
+            db.create_audit_log("BURST", "SYSTEM", f"Event {i}", "INFO")
+        assert db.get_audit_log_count() == 50
+        db.conn.set_trace_callback(None)
+
+        assert statements.count("COMMIT") <= 2
+
+    def test_failed_login_storm_batched(self, db, audit_logger):
+        """Test failed login audit events outside transaction() are batched."""
+        statements = []
+        db.conn.set_trace_callback(statements.append)
+        for _ in range(20):
+            audit_logger.log_login_failed("attacker", "Invalid credentials")
+        assert db.get_audit_log_count() == 20
+        db.conn.set_trace_callback(None)
+
+        assert statements.count("COMMIT") < 20
+
+    def test_create_audit_log_survives_rollback(self, db):
+        """Test audit entries logged in a failed transaction are kept."""
+        with pytest.raises(ValueError):
+            with db.transaction():
+                db.create_audit_log("FAILED", "SYSTEM", "Rolled back", "WARNING")
+                raise ValueError("boom")
+
+        assert db.get_audit_log_count() == 1
+
+    def test_create_audit_log_flushed_by_timer(self, temp_db, monkeypatch):
+        """Test a buffered entry reaches other instances without another call."""
+        monkeypatch.setattr(db_manager, "AUDIT_FLUSH_INTERVAL", 0.01)
+        temp_db.create_audit_log("LOGIN_SUCCESS", "AUTHENTICATION", "Login", "INFO")
+
+        other = DatabaseManager(temp_db.db_path)
+        try:
+            deadline = time.monotonic() + 5
+            while other.get_audit_log_count() == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert other.get_audit_log_count() == 1
+        finally:
+            other.close()
+
+    def test_flush_audit_logs_keeps_entries_on_error(self, temp_db):
+        """Test entries are kept for the next flush when the write fails."""
+        temp_db.create_audit_log("KEPT", "SYSTEM", "Retry me", "INFO")
+        broken = sqlite3.connect(":memory:")
+        broken.close()
+        temp_db._audit_conn = broken
+
+        assert temp_db.flush_audit_logs() is False
+        assert len(temp_db._pending_audit) == 1
+
+        temp_db._audit_conn = None
+        assert temp_db.flush_audit_logs() is True
+        assert temp_db.get_audit_log_count() == 1
+
+    def test_flush_audit_logs_skips_bad_entry(self, db):
+        """Test one invalid entry does not drop the rest of its batch."""
+        db.create_audit_log("GOOD", "SYSTEM", "First entry", "INFO")
+        db.create_audit_log("BAD", "SYSTEM", None, "INFO")
+        db.create_audit_log("GOOD", "SYSTEM", "Buffered", "INFO")
+
+        assert db.flush_audit_logs() is False
+        descriptions = {log["description"] for log in db.search_audit_logs({})}
+        assert descriptions == {"First entry", "Buffered"}
+
     def test_get_audit_logs_by_user(self, db, audit_logger, test_user):
         """Test retrieving logs by user."""
         user_id, username = test_user
@@ -333,6 +405,29 @@ class TestDatabaseAuditMethods:
         page3 = db.get_audit_logs_by_user(user_id, limit=10, offset=20)
         assert len(page3) == 5
 
+    def test_get_audit_logs_by_user_keyset(self, db, audit_logger, test_user):
+        """Test keyset pagination walks every log exactly once."""
+        user_id, username = test_user
+
+        for i in range(25):
+            audit_logger.log_login_success(user_id, username)
+
+        seen = []
+        page = db.get_audit_logs_by_user(user_id, limit=10)
+        while page:
+            seen.extend(log["log_id"] for log in page)
+            last = page[-1]
+            page = db.get_audit_logs_by_user(
+                user_id,
+                limit=10,
+                after_created_at=last["created_at"],
+                after_log_id=last["log_id"],
+            )
+
+        expected = [log["log_id"] for log in db.get_audit_logs_by_user(user_id)]
+        assert len(seen) == 25
+        assert seen == expected
+
     def test_get_audit_logs_by_type(self, db, audit_logger, test_user):
         """Test filtering logs by event type."""
         user_id, username = test_user
@@ -393,6 +488,41 @@ class TestDatabaseAuditMethods:
         assert len(results) >= 1
         assert all(log["user_id"] == user_id for log in results)
 
+    def test_search_audit_logs_username_substring(self, db):
+        """Test username search matches substrings through the trigram index."""
+        db.create_audit_log("LOGIN", "AUTH", "a", "INFO", username="Alice_Smith")
+        db.create_audit_log("LOGIN", "AUTH", "b", "INFO", username="bob")
+        db.create_audit_log("LOGIN", "AUTH", "c", "INFO")
+
+        def found(term):
+            return {log["username"] for log in db.search_audit_logs({"username": term})}
+
+        assert found("lice_s") == {"Alice_Smith"}
+        assert found("b") == {"bob"}  # shorter than a trigram
+
+        db.conn.execute("DELETE FROM audit_logs WHERE username = 'bob'")
+        assert found("bob") == set()
+
+    def test_end_date_as_day_includes_whole_day(self, db):
+        """Test a bare end date covers logs created later that day."""
+        db.create_audit_log("EVENT", "SYSTEM", "Late", "INFO")
+        db.flush_audit_logs()
+        db.conn.execute("UPDATE audit_logs SET created_at = '2024-05-01 23:30:00'")
+        db.create_audit_log("EVENT", "SYSTEM", "Next day", "INFO")
+        db.flush_audit_logs()
+        db.conn.execute(
+            "UPDATE audit_logs SET created_at = '2024-05-02 00:10:00' "
+            "WHERE description = 'Next day'"
+        )
+
+        filters = {"start_date": "2024-05-01", "end_date": "2024-05-01"}
+        assert [log["description"] for log in db.search_audit_logs(filters)] == [
+            "Late"
+        ]
+        assert db.get_audit_log_count(filters) == 1
+        logs = db.get_audit_logs_by_date_range("2024-05-01", "2024-05-01")
+        assert [log["description"] for log in logs] == ["Late"]
+
     def test_get_audit_log_count(self, db, audit_logger, test_user):
         """Test getting total log count."""
         user_id, username = test_user
@@ -406,6 +536,18 @@ class TestDatabaseAuditMethods:
         new_count = db.get_audit_log_count()
         assert new_count == initial_count + 5
 
+    def test_get_audit_log_count_tracks_deletes(self, db, audit_logger, test_user):
+        """Test the unfiltered count stays exact as logs are added and removed."""
+        user_id, username = test_user
+
+        for i in range(3):
+            audit_logger.log_login_success(user_id, username)
+        db.flush_audit_logs()
+        db.conn.execute("DELETE FROM audit_logs WHERE log_id = 1")
+
+        actual = db.conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0]
+        assert db.get_audit_log_count() == actual
+
     def test_get_audit_log_count_with_filters(self, db, audit_logger, test_user):
         """Test getting count with filters."""
         user_id, username = test_user
@@ -417,6 +559,35 @@ class TestDatabaseAuditMethods:
         count = db.get_audit_log_count({"event_type": "LOGIN_SUCCESS"})
         assert count == 2
 
+    def test_filtered_pages_read_in_index_order(self, db):
+        """Test filtered newest-first audit queries need no separate sort."""
+        for where, params in (
+            ("user_id = ?", (1,)),
+            ("event_type = ?", ("LOGIN_SUCCESS",)),
+            ("event_category = 'SECURITY' AND severity = ?", ("CRITICAL",)),
+        ):
+            plan = db.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT log_id FROM audit_logs "
+                f"WHERE {where} AND (created_at, log_id) < (?, ?) "
+                "ORDER BY created_at DESC, log_id DESC LIMIT 10",
+                params + ("9999-12-31", 0),
+            ).fetchall()
+            details = " ".join(row[3] for row in plan)
+            assert "INDEX idx_audit_" in details
+            assert "TEMP B-TREE" not in details
+
+    def test_get_audit_log_count_matches_search(self, db, audit_logger, test_user):
+        """Test count and search apply the same filters, including username."""
+        user_id, username = test_user
+
+        audit_logger.log_login_success(user_id, username)
+        audit_logger.log_logout(user_id, username)
+        audit_logger.log_login_success(None, "someone_else")
+
+        filters = {"username": username, "event_type": "LOGIN_SUCCESS"}
+        assert db.get_audit_log_count(filters) == 1
+        assert len(db.search_audit_logs(filters)) == 1
+
     def test_export_audit_logs_csv(self, db, audit_logger, test_user):
         """Test exporting logs to CSV."""
         user_id, username = test_user
@@ -443,6 +614,20 @@ class TestDatabaseAuditMethods:
             if os.path.exists(filepath):
                 os.remove(filepath)
 
+    def test_iter_audit_logs_by_date_range(self, db, audit_logger, test_user):
+        """Test streaming logs matches the list-returning getter."""
+        user_id, username = test_user
+
+        for i in range(5):
+            audit_logger.log_login_success(user_id, username)
+
+        start = (datetime.now() - timedelta(days=1)).isoformat()
+        end = (datetime.now() + timedelta(days=1)).isoformat()
+        logs = db.iter_audit_logs_by_date_range(start, end)
+
+        assert not isinstance(logs, list)
+        assert list(logs) == db.get_audit_logs_by_date_range(start, end)
+
     def test_delete_old_audit_logs(self, db):
         """Test deleting old audit logs."""
         # Create old log by manipulating the timestamp
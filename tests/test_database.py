@@ -5,6 +5,7 @@ Tests DatabaseManager class methods
 
 import pytest
 import os
+import sqlite3
 from database.db_manager import DatabaseManager
 
 
@@ -45,6 +46,109 @@ class TestDatabaseInitialization:
         )
         assert cursor.fetchone() is not None
 
+    @pytest.mark.database
+    def test_wal_journal_mode(self, temp_db):
+        """Test file databases are opened in WAL mode."""
+        mode = temp_db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert mode == "wal"
+
+    @pytest.mark.database
+    def test_cache_and_page_size(self, tmp_path):
+        """Test new databases use 8 KB pages and the configured cache size."""
+        db = DatabaseManager(str(tmp_path / "tuned.db"), cache_mb=16)
+        try:
+            assert db.conn.execute("PRAGMA page_size").fetchone()[0] == 8192
+            assert db.conn.execute("PRAGMA cache_size").fetchone()[0] == -16384
+        finally:
+            db.close()
+
+    @pytest.mark.database
+    def test_schema_setup_skipped_when_current(self, temp_db, monkeypatch):
+        """Test reopening an up-to-date database skips create_tables."""
+        calls = []
+        monkeypatch.setattr(
+            DatabaseManager, "create_tables", lambda self: calls.append(self)
+        )
+
+        reopened = DatabaseManager(temp_db.db_path)
+        reopened.close()
+
+        assert calls == []
+
+    @pytest.mark.database
+    def test_money_stored_as_cents(self, db_with_accounts):
+        """Test balances are stored as integer cents and read back as dollars."""
+        db, user_id, accounts = db_with_accounts
+        checking_id = accounts["checking"]["id"]
+
+        db.update_balance(checking_id, 0.1 + 0.2)
+        stored = db.conn.execute(
+            "SELECT balance FROM accounts WHERE account_id = ?", (checking_id,)
+        ).fetchone()[0]
+
+        assert stored == 30
+        assert db.get_account(checking_id)["balance"] == 0.3
+
+    @pytest.mark.database
+    def test_migrate_real_money_columns(self, tmp_path):
+        """Test databases with REAL dollar columns are converted to cents."""
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE accounts (
+                account_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                account_number TEXT UNIQUE NOT NULL,
+                account_type TEXT NOT NULL,
+                balance REAL NOT NULL DEFAULT 0,
+                interest_rate REAL DEFAULT 0,
+                credit_limit REAL DEFAULT 0,
+                status TEXT DEFAULT 'active',
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE transactions (
+                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account_id INTEGER NOT NULL,
+                transaction_type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                category TEXT,
+                description TEXT,
+                balance_after REAL NOT NULL,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO accounts (user_id, account_number, account_type, balance)
+            VALUES (1, '1234567890', 'Checking', 150.25);
+            INSERT INTO transactions (account_id, transaction_type, amount, balance_after)
+            VALUES (1, 'Deposit', 150.25, 150.25);
+            """
+        )
+        conn.close()
+
+        db = DatabaseManager(path)
+        try:
+            stored = db.conn.execute(
+                "SELECT balance, typeof(balance) FROM accounts"
+            ).fetchone()
+            assert tuple(stored) == (15025, "integer")
+            assert db.get_account(1)["balance"] == 150.25
+            assert db.get_transactions(1)[0]["amount"] == 150.25
+            assert db.get_account_statistics(1)["total_deposits"] == 150.25
+        finally:
+            db.close()
+
+    @pytest.mark.database
+    def test_lookup_indexes_used(self, temp_db):
+        """Test hot account lookups are served by an index."""
+        plan = temp_db.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT account_id FROM accounts "
+            "WHERE user_id = ? AND status = 'active' ORDER BY created_at DESC",
+            (1,),
+        ).fetchall()
+
+        assert any("idx_accounts_user" in row[3] for row in plan)
+
 
 class TestUserManagement:
     """Test user creation and authentication."""
@@ -212,6 +316,99 @@ class TestAccountManagement:
         account = db.get_account(checking_id)
         assert account["balance"] == 1500.0
 
+    @pytest.mark.database
+    def test_get_account_cached_until_write(self, db_with_accounts):
+        """Test repeat account lookups are cached and writes invalidate them."""
+        db, user_id, accounts = db_with_accounts
+        checking_id = accounts["checking"]["id"]
+
+        first = db.get_account(checking_id)
+        db.conn.execute(
+            "UPDATE accounts SET status = 'frozen' WHERE account_id = ?", (checking_id,)
+        )
+
+        cached = db.get_account(checking_id)
+        assert cached is first
+        assert cached["status"] == "active"
+
+        db.update_balance(checking_id, 900.0)
+        fresh = db.get_account(checking_id)
+        assert fresh["status"] == "frozen"
+        assert fresh["balance"] == 900.0
+
+    @pytest.mark.database
+    def test_balance_update_batched_with_transaction(self, db_with_accounts):
+        """Test writes inside transaction() are committed together."""
+        db, user_id, accounts = db_with_accounts
+        checking_id = accounts["checking"]["id"]
+        reader = sqlite3.connect(db.db_path)
+
+        with db.transaction():
+            db.update_balance(checking_id, 1100.0)
+            db.add_transaction(checking_id, "Deposit", 100.0, "Cash", 1100.0)
+            assert db.conn.in_transaction
+
+        balance = reader.execute(
+            "SELECT balance FROM accounts WHERE account_id = ?", (checking_id,)
+        ).fetchone()[0]
+        reader.close()
+        assert balance == 110000
+
+    @pytest.mark.database
+    def test_read_after_write_inside_transaction(self, db_with_accounts):
+        """Test reads inside transaction() see its writes and cache nothing stale."""
+        db, user_id, accounts = db_with_accounts
+        checking_id = accounts["checking"]["id"]
+
+        with db.transaction():
+            db.update_balance(checking_id, 500.0)
+            assert db.get_account(checking_id)["balance"] == 500.0
+        assert db.get_account(checking_id)["balance"] == 500.0
+
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.update_balance(checking_id, 42.0)
+                assert db.get_account(checking_id)["balance"] == 42.0
+                raise RuntimeError("roll back")
+        assert db.get_account(checking_id)["balance"] == 500.0
+
+    @pytest.mark.database
+    def test_nested_transaction_rolls_back_to_savepoint(self, db_with_accounts):
+        """Test a failed nested block only undoes its own writes."""
+        db, user_id, accounts = db_with_accounts
+        checking_id = accounts["checking"]["id"]
+        savings_id = accounts["savings"]["id"]
+
+        with db.transaction():
+            db.update_balance(checking_id, 900.0)
+            with pytest.raises(RuntimeError):
+                with db.transaction():
+                    db.update_balance(savings_id, 0.0)
+                    raise RuntimeError("abort inner block")
+
+        assert db.get_account(checking_id)["balance"] == 900.0
+        assert db.get_account(savings_id)["balance"] == 5000.0
+
+    @pytest.mark.database
+    def test_delete_account_removes_history(self, db_with_accounts):
+        """Test deleting an account removes its transactions and transfers."""
+        db, user_id, accounts = db_with_accounts
+        checking_id = accounts["checking"]["id"]
+        savings_id = accounts["savings"]["id"]
+        db.create_transfer(checking_id, savings_id, 100.0)
+
+        success, message = db.delete_account(checking_id)
+
+        assert success is True
+        assert db.get_account(checking_id) is None
+        assert db.get_transactions(checking_id) == []
+        assert db.conn.execute("SELECT COUNT(*) FROM transfers").fetchone()[0] == 0
+        assert len(db.get_transactions(savings_id)) == 2
+
+        success, message = db.delete_account(checking_id)
+        assert success is False
+        assert message == "Account not found"
+
     @pytest.mark.database
     def test_unique_account_numbers(self, db_with_user):
         """Test that account numbers are unique."""
@@ -224,6 +421,20 @@ class TestAccountManagement:
 
         assert len(account_numbers) == 10  # All unique
 
+    @pytest.mark.database
+    def test_account_number_collision_retries(self, db_with_user, monkeypatch):
+        """Test a taken account number is replaced by a fresh one."""
+        db, user_id = db_with_user
+        numbers = iter(["1111111111", "1111111111", "2222222222"])
+        monkeypatch.setattr(db, "_generate_account_number", lambda: next(numbers))
+
+        first_id, first_number = db.create_account(user_id, "checking", 0.0)
+        second_id, second_number = db.create_account(user_id, "checking", 0.0)
+
+        assert first_number == "1111111111"
+        assert second_number == "2222222222"
+        assert second_id is not None
+
 
 class TestTransactionManagement:
     """Test transaction recording and retrieval."""
@@ -302,6 +513,28 @@ class TestTransactionManagement:
 
         assert len(transactions) == 5
 
+    @pytest.mark.database
+    def test_iter_transactions(self, db_with_accounts):
+        """Test streaming transactions matches the list API."""
+        db, user_id, accounts = db_with_accounts
+        checking_id = accounts["checking"]["id"]
+
+        for i in range(300):
+            db.add_transaction(checking_id, "Deposit", 1.0, "Bulk", 1001.0 + i)
+
+        streamed = db.iter_transactions(checking_id)
+
+        assert not isinstance(streamed, list)
+        assert list(streamed) == db.get_transactions(checking_id)
+
+    @pytest.mark.database
+    def test_get_transactions_rejects_non_numeric_limit(self, db_with_accounts):
+        """Test limit is bound as an integer, not pasted into the SQL."""
+        db, user_id, accounts = db_with_accounts
+
+        with pytest.raises(ValueError):
+            db.get_transactions(accounts["checking"]["id"], limit="1; DROP TABLE users")
+
     @pytest.mark.database
     def test_get_transactions_by_category(self, db_with_accounts):
         """Test filtering transactions by category."""
@@ -362,6 +595,25 @@ class TestTransactionManagement:
         assert stats["total_withdrawals"] == 300.0
         assert stats["total_transactions"] >= 4  # Initial + 3 new
 
+    @pytest.mark.database
+    def test_account_statistics_track_transfers_and_deletes(self, db_with_accounts):
+        """Test running statistics follow transfers and account deletion."""
+        db, user_id, accounts = db_with_accounts
+
+        checking_id = accounts["checking"]["id"]
+        savings_id = accounts["savings"]["id"]
+        before = db.get_account_statistics(savings_id)
+
+        db.create_transfer(checking_id, savings_id, 250.0, "Move")
+
+        assert db.get_account_statistics(checking_id)["total_transfers_out"] == 250.0
+        after = db.get_account_statistics(savings_id)
+        assert after["total_transfers_in"] == 250.0
+        assert after["total_transactions"] == before["total_transactions"] + 1
+
+        db.delete_account(checking_id)
+        assert db.get_account_statistics(checking_id)["total_transactions"] == 0
+
     @pytest.mark.database
     def test_get_spending_by_category(self, db_with_accounts):
         """Test getting spending breakdown by category."""
@@ -399,6 +651,29 @@ class TestTransactionManagement:
         assert food_spending is not None
         assert food_spending["total"] == 250.0
 
+    @pytest.mark.database
+    def test_get_spending_matrix(self, db_with_accounts):
+        """Test spending is summed per category across accounts."""
+        db, user_id, accounts = db_with_accounts
+
+        checking_id = accounts["checking"]["id"]
+        savings_id = accounts["savings"]["id"]
+        db.add_transaction(
+            checking_id, "Withdrawal", 0.1, "Coffee", 999.9, category="Food & Dining"
+        )
+        db.add_transaction(
+            savings_id, "Withdrawal", 0.2, "Coffee", 4999.8, category="Food & Dining"
+        )
+        db.add_transaction(
+            savings_id, "Withdrawal", 5.0, "Book", 4994.8, category="Shopping"
+        )
+
+        categories, totals = db.get_spending_matrix([checking_id, savings_id])
+
+        assert categories == ["Shopping", "Food & Dining"]
+        assert totals == [5.0, 0.3]
+        assert db.get_spending_matrix([]) == ([], [])
+
 
 class TestTransfers:
     """Test transfer functionality between accounts."""
@@ -530,3 +805,39 @@ class TestDatabaseConcurrency:
 
         transactions = db.get_transactions(checking_id)
         assert len(transactions) == initial_count + 10
+
+    @pytest.mark.database
+    def test_reads_from_other_threads(self, db_with_accounts):
+        """Test read queries work from threads other than the creator."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        db, user_id, accounts = db_with_accounts
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(lambda _: len(db.get_user_accounts(user_id)), range(8))
+            )
+
+        assert results == [3] * 8
+
+    @pytest.mark.database
+    def test_pooled_connections_are_read_only(self, temp_db):
+        """Test the read pool cannot be used to write."""
+        with temp_db._read_connection() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM users")
+
+    @pytest.mark.database
+    def test_exhausted_pool_does_not_block(self, temp_db, monkeypatch):
+        """Test a read still runs when every pooled connection is borrowed."""
+        monkeypatch.setattr(temp_db._pool, "_timeout", 0.01)
+        held = [temp_db._read_connection() for _ in range(temp_db.pool_size)]
+        for borrowed in held:
+            borrowed.__enter__()
+
+        try:
+            assert temp_db.get_user_accounts(999) == []
+        finally:
+            for borrowed in held:
+                borrowed.__exit__(None, None, None)
+        assert temp_db._pool._idle.qsize() == temp_db.pool_size
@@ -7,7 +7,9 @@ including creation, retrieval, updates, and cleanup operations.
 
 import pytest
 import os
+import sqlite3
 from datetime import datetime, timedelta
+from database import db_manager
 from database.db_manager import DatabaseManager
 
 
@@ -106,7 +108,6 @@ class TestSessionRetrieval:
         db.create_session(test_user, token, created, expires)
         session = db.get_session(token)
 
-        assert "session_id" in session
         assert "user_id" in session
         assert "session_token" in session
         assert "created_at" in session
@@ -241,6 +242,17 @@ class TestExpiredSessionCleanup:
         assert db.get_session(expired_token) is None
         assert db.get_session(valid_token) is not None
 
+    def test_cleanup_expired_sessions_in_batches(self, db, test_user, monkeypatch):
+        """Test cleanup counts sessions across several batches."""
+        monkeypatch.setattr(db_manager, "SESSION_CLEANUP_BATCH", 2)
+        now = datetime.now()
+        expired_time = (now - timedelta(minutes=10)).isoformat()
+        for i in range(5):
+            db.create_session(test_user, f"expired_{i}", expired_time, expired_time)
+
+        assert db.cleanup_expired_sessions(now.isoformat()) == 5
+        assert db.get_session("expired_4") is None
+
     def test_cleanup_no_expired_sessions(self, db, test_user):
         """Test cleanup when no sessions are expired."""
         now = datetime.now()
@@ -294,7 +306,6 @@ class TestSessionPersistence:
         session2 = db.get_session(token)
 
         # Verify integrity
-        assert session1["session_id"] == session2["session_id"]
         assert session1["user_id"] == session2["user_id"]
         assert session1["session_token"] == session2["session_token"]
         assert session1["created_at"] == session2["created_at"]
@@ -328,3 +339,34 @@ class TestSessionPersistence:
 
         # Verify deleted
         assert db.get_session(token) is None
+
+    def test_legacy_sessions_table_migrated(self, tmp_path):
+        """Test a sessions table keyed by session_id is rebuilt by token."""
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE sessions (
+                session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                session_token TEXT UNIQUE NOT NULL,
+                created_at TEXT NOT NULL,
+                last_activity TEXT NOT NULL,
+                expires_at TEXT NOT NULL
+            );
+            INSERT INTO sessions (user_id, session_token, created_at,
+                                  last_activity, expires_at)
+            VALUES (1, 'legacy_token', '2024-01-01', '2024-01-01', '2099-01-01');
+            """
+        )
+        conn.close()
+
+        db = DatabaseManager(path)
+        try:
+            table = db.conn.execute("PRAGMA table_list(sessions)").fetchone()
+            assert table["wr"] == 1 and table["strict"] == 1
+            session = db.get_session("legacy_token")
+            assert session["user_id"] == 1
+            assert "session_id" not in session
+        finally:
+            db.close()
@@ -217,6 +217,23 @@ class TestInterestDatabaseIntegration:
         assert savings1_id in account_ids
         assert savings2_id in account_ids
 
+    def test_apply_interest_batch(self, db):
+        """Test interest is credited to several accounts in one batch."""
+        user_id = db.create_user("testuser", "TestPass123!", "Test User")
+        savings1_id, _ = db.create_account(user_id, "Savings", 1000, interest_rate=0.02)
+        savings2_id, _ = db.create_account(user_id, "Savings", 2000, interest_rate=0.03)
+        now = datetime.now().isoformat()
+
+        success = db.apply_interest_batch([(savings1_id, 1.64), (savings2_id, 4.93)], now)
+
+        assert success is True
+        assert db.get_account(savings1_id)["balance"] == 1001.64
+        assert db.get_account(savings2_id)["last_interest_date"] == now
+        latest = db.get_transactions(savings2_id, limit=1)[0]
+        assert latest["transaction_type"] == "Interest"
+        assert latest["amount"] == 4.93
+        assert latest["balance_after"] == 2004.93
+
     def test_savings_account_apply_interest(self):
         """Test applying interest to a savings account."""
         account = SavingsAccount(
@@ -2,6 +2,7 @@
 
 import pytest
 from datetime import datetime, timedelta
+from database import db_manager
 from database.db_manager import DatabaseManager
 from utils.password_expiration import PasswordExpirationManager
 from config import SecurityConfig
@@ -383,6 +384,49 @@ class TestChangeUserPassword:
         is_reused, _ = self.db.check_password_reuse(self.user_id, self.old_password)
         assert is_reused
 
+    def test_change_password_by_username_verifies_once(self, monkeypatch):
+        """Test a username-based change checks the old password only once."""
+        calls = []
+        verify = self.db.verify_password
+
+        def counting_verify(password, hashed):
+            calls.append(password)
+            return verify(password, hashed)
+
+        monkeypatch.setattr(self.db, "verify_password", counting_verify)
+        success, _ = self.db.change_user_password_by_username(
+            self.username, self.old_password, "NewPassword456!"
+        )
+
+        assert success
+        assert calls == [self.old_password]
+
+    def test_change_password_commits_once(self):
+        """Test the password update and history entry share one commit."""
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        success, _ = self.db.change_user_password(
+            self.user_id, self.old_password, "NewPassword456!"
+        )
+        self.db.conn.set_trace_callback(None)
+
+        assert success
+        assert statements.count("COMMIT") == 1
+
+    def test_password_reuse_checked_by_tag(self, monkeypatch):
+        """Test tagged history entries are matched without a hash check."""
+        monkeypatch.setattr(db_manager, "PASSWORD_PEPPER", b"test-pepper")
+        self.db.change_user_password(self.user_id, self.old_password, "NewPassword456!")
+
+        def fail_verify(*args):
+            raise AssertionError("password hash should not be checked")
+
+        monkeypatch.setattr(self.db, "verify_password", fail_verify)
+        is_reused, _ = self.db.check_password_reuse(self.user_id, self.old_password)
+        assert is_reused
+        is_reused, _ = self.db.check_password_reuse(self.user_id, "Another789!")
+        assert not is_reused
+
     def test_change_password_multiple_times(self):
         """Test changing password multiple times maintains history."""
         passwords = [
@@ -2,7 +2,9 @@
 
 import pytest
 import bcrypt
+import sqlite3
 from datetime import datetime, timedelta
+from database import db_manager
 from database.db_manager import DatabaseManager
 from utils.password_validator import PasswordValidator
 
@@ -52,6 +54,104 @@ class TestPasswordHashing:
 
         assert DatabaseManager.verify_password("testpassword123!", hashed) is False
 
+    def test_hash_password_uses_configured_cost(self):
+        """Test that new hashes use the configured bcrypt work factor."""
+        hashed = DatabaseManager.hash_password("TestPassword123!")
+
+        assert DatabaseManager.password_needs_rehash(hashed) is False
+
+    def test_verify_password_caches_matches(self, monkeypatch):
+        """Test that a repeated successful verification skips bcrypt."""
+        password = "CachedPassword123!"
+        hashed = DatabaseManager.hash_password(password)
+        assert DatabaseManager.verify_password(password, hashed) is True
+
+        def fail_checkpw(*args):
+            raise AssertionError("bcrypt.checkpw should not be called")
+
+        monkeypatch.setattr(db_manager.bcrypt, "checkpw", fail_checkpw)
+        assert DatabaseManager.verify_password(password, hashed) is True
+        # Failures are never cached, so a wrong password still hits bcrypt
+        assert DatabaseManager.verify_password("Wrong", hashed) is False
+
+    def test_verify_cache_entries_expire(self, monkeypatch):
+        """Test cached verifications are redone once their TTL has passed."""
+        password = "ExpiringPassword123!"
+        hashed = DatabaseManager.hash_password(password)
+        monkeypatch.setattr(db_manager, "_VERIFY_CACHE_TTL", 0.0)
+        assert DatabaseManager.verify_password(password, hashed) is True
+
+        calls = []
+        real_checkpw = db_manager.bcrypt.checkpw
+        monkeypatch.setattr(
+            db_manager.bcrypt,
+            "checkpw",
+            lambda *args: calls.append(args) or real_checkpw(*args),
+        )
+
+        assert DatabaseManager.verify_password(password, hashed) is True
+        assert len(calls) == 1
+
+    def test_async_hash_and_verify(self):
+        """Test hashing and verification in the worker process pool."""
+        hashed = DatabaseManager.hash_password_async("TestPassword123!").result(30)
+
+        assert hashed.startswith("$2b$")
+        assert DatabaseManager.verify_password_async(
+            "TestPassword123!", hashed
+        ).result(30)
+        assert not DatabaseManager.verify_password_async("Wrong", hashed).result(30)
+
+    def test_login_keeps_stronger_hash(self, tmp_path):
+        """Test that a hash above the configured cost is not downgraded."""
+        db = DatabaseManager(str(tmp_path / "test_rehash.db"))
+        user_id = db.create_user("rehashuser", "TestPass123!", "Rehash User")
+
+        cost = db_manager.BCRYPT_ROUNDS + 1
+        strong_hash = bcrypt.hashpw(
+            b"TestPass123!", bcrypt.gensalt(rounds=cost)
+        ).decode()
+        db.cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE user_id = ?",
+            (strong_hash, user_id),
+        )
+        db.conn.commit()
+        assert DatabaseManager.password_needs_rehash(strong_hash) is False
+
+        assert db.authenticate_user("rehashuser", "TestPass123!") == user_id
+
+        stored_hash = db.cursor.execute(
+            "SELECT password_hash FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+        assert stored_hash == strong_hash
+        db.close()
+
+    def test_hash_cost_never_below_minimum(self, monkeypatch):
+        """Test new hashes use at least the minimum cost and weaker ones rehash."""
+        monkeypatch.setattr(db_manager, "BCRYPT_MIN_ROUNDS", 5)
+        hashed = DatabaseManager.hash_password("TestPassword123!", rounds=4)
+
+        assert hashed.startswith("$2b$05$")
+        weak_hash = bcrypt.hashpw(b"TestPass123!", bcrypt.gensalt(rounds=4)).decode()
+        assert DatabaseManager.password_needs_rehash(weak_hash, rounds=4) is True
+
+    def test_instance_bcrypt_cost_used_and_upgraded(self, tmp_path):
+        """Test a per-instance bcrypt cost for new hashes and login upgrades."""
+        db = DatabaseManager(str(tmp_path / "test_cost.db"), bcrypt_cost=5)
+        user_id = db.create_user("costuser", "TestPass123!", "Cost User")
+        select_hash = "SELECT password_hash FROM users WHERE user_id = ?"
+        assert db.cursor.execute(select_hash, (user_id,)).fetchone()[0][:7] == "$2b$05$"
+
+        old_hash = bcrypt.hashpw(b"TestPass123!", bcrypt.gensalt(rounds=4)).decode()
+        db.cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE user_id = ?", (old_hash, user_id)
+        )
+        db.conn.commit()
+
+        assert db.authenticate_user("costuser", "TestPass123!") == user_id
+        assert db.cursor.execute(select_hash, (user_id,)).fetchone()[0][:7] == "$2b$05$"
+        db.close()
+
 
 class TestPasswordValidator:
     """Test password validation and strength checking."""
@@ -215,13 +315,14 @@ class TestAccountLockout:
 
         # Simulate account locked 20 minutes ago
         past_time = datetime.now() - timedelta(minutes=20)
+        past_ms = int(past_time.timestamp() * 1000)
         db.cursor.execute(
             """
             UPDATE users
             SET failed_login_attempts = 5, account_locked_until = ?
             WHERE user_id = ?
         """,
-            (past_time.isoformat(), user_id),
+            (past_ms, user_id),
         )
         db.conn.commit()
 
@@ -233,6 +334,138 @@ class TestAccountLockout:
         result = db.authenticate_user("testuser", "TestPass123!")
         assert result == user_id
 
+    def test_failed_login_after_expired_lockout_restarts_count(self, db):
+        """Test a failed login after a lockout expires counts from one."""
+        user_id = db.create_user("testuser", "TestPass123!", "Test User")
+        past_ms = int((datetime.now() - timedelta(minutes=20)).timestamp() * 1000)
+        db.cursor.execute(
+            """
+            UPDATE users
+            SET failed_login_attempts = 5, account_locked_until = ?
+            WHERE user_id = ?
+        """,
+            (past_ms, user_id),
+        )
+        db.conn.commit()
+
+        assert db.authenticate_user("testuser", "WrongPassword") is None
+
+        row = db.cursor.execute(
+            "SELECT failed_login_attempts, account_locked_until FROM users "
+            "WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        assert tuple(row) == (1, None)
+
+    def test_migrates_text_lockout_times(self, tmp_path):
+        """Test ISO text lockout times from older databases become epoch ms."""
+        path = str(tmp_path / "legacy.db")
+        locked_until = datetime.now() + timedelta(minutes=10)
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE users (
+                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                full_name TEXT NOT NULL,
+                email TEXT,
+                phone TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                last_login TEXT,
+                failed_login_attempts INTEGER DEFAULT 0,
+                account_locked_until TEXT
+            );
+            """
+        )
+        conn.execute(
+            "INSERT INTO users (username, password_hash, full_name, "
+            "failed_login_attempts, account_locked_until) VALUES (?, ?, ?, ?, ?)",
+            ("legacy", "x", "Legacy User", 5, locked_until.isoformat()),
+        )
+        conn.commit()
+        conn.close()
+
+        legacy_db = DatabaseManager(path)
+        try:
+            is_locked, unlock_time = legacy_db.is_account_locked("legacy")
+            assert is_locked is True
+            assert abs((unlock_time - locked_until).total_seconds()) < 1
+        finally:
+            legacy_db.close()
+
+    def test_added_lockout_column_stores_epoch_ms(self, tmp_path):
+        """Test a lockout column added to an older users table is INTEGER."""
+        path = str(tmp_path / "no_lockout.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE users (user_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "username TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, "
+            "full_name TEXT NOT NULL, email TEXT, phone TEXT, "
+            "created_at TEXT DEFAULT CURRENT_TIMESTAMP, last_login TEXT)"
+        )
+        conn.commit()
+        conn.close()
+
+        legacy_db = DatabaseManager(path)
+        try:
+            assert legacy_db._column_types("users")["account_locked_until"] == (
+                "INTEGER"
+            )
+            legacy_db.create_user("testuser", "TestPass123!", "Test User")
+            for _ in range(5):
+                legacy_db.authenticate_user("testuser", "WrongPassword")
+
+            is_locked, unlock_time = legacy_db.is_account_locked("testuser")
+            assert is_locked is True
+            assert unlock_time > datetime.now()
+        finally:
+            legacy_db.close()
+
+    def test_unknown_user_still_checks_a_hash(self, db, monkeypatch):
+        """Test unknown usernames cost a password check like real ones."""
+        checked = []
+        real_verify = db_manager._verify_password
+        monkeypatch.setattr(
+            db_manager,
+            "_verify_password",
+            lambda password, hashed: checked.append(hashed)
+            or real_verify(password, hashed),
+        )
+
+        assert db.authenticate_user("nobody", "TestPass123!") is None
+        assert checked == [db_manager._dummy_hash(db.bcrypt_cost)]
+
+    def test_dummy_hash_uses_instance_cost(self, tmp_path, monkeypatch):
+        """Test unknown usernames are checked at the instance's bcrypt cost."""
+        db = DatabaseManager(str(tmp_path / "test_dummy.db"), bcrypt_cost=5)
+        checked = []
+        monkeypatch.setattr(
+            db_manager,
+            "_verify_password",
+            lambda password, hashed: checked.append(hashed) or False,
+        )
+
+        assert db.authenticate_user("nobody", "TestPass123!") is None
+        assert checked[0].startswith("$2b$05$")
+        db.close()
+
+    def test_locked_account_checks_dummy_hash(self, db, monkeypatch):
+        """Test a locked account costs a hash check without using the real hash."""
+        db.create_user("testuser", "TestPass123!", "Test User")
+        for _ in range(5):
+            db.authenticate_user("testuser", "WrongPassword")
+
+        checked = []
+        monkeypatch.setattr(
+            db_manager,
+            "_verify_password",
+            lambda password, hashed: checked.append(hashed) or False,
+        )
+
+        assert db.authenticate_user("testuser", "TestPass123!") is None
+        assert checked == [db_manager._dummy_hash(db.bcrypt_cost)]
+
     def test_is_account_locked_nonexistent_user(self, db):
         """Test is_account_locked with non-existent user."""
         is_locked, unlock_time = db.is_account_locked("nonexistent")
@@ -1,9 +1,12 @@
 """Comprehensive tests for Two-Factor Authentication functionality."""
 
+import json
 import pytest
+import sqlite3
 import time
 from datetime import datetime, timedelta
 from utils.totp_manager import TOTPManager
+from database import db_manager
 from database.db_manager import DatabaseManager
 
 
@@ -282,22 +285,35 @@ class TestDatabaseTwoFactor:
         secret = db.get_2fa_secret(user_id)
         assert secret is None
 
-    def test_get_backup_codes(self, db, user_id):
-        """Test retrieving backup codes."""
+    def test_get_backup_code_count(self, db, user_id):
+        """Test counting stored backup codes."""
         manager = TOTPManager()
         secret = manager.generate_secret()
         backup_codes = manager.generate_backup_codes()
 
         db.enable_2fa(user_id, secret, backup_codes)
 
-        retrieved_codes = db.get_backup_codes(user_id)
-        assert retrieved_codes == backup_codes
-        assert len(retrieved_codes) == 10
+        assert db.get_backup_code_count(user_id) == 10
 
-    def test_get_backup_codes_when_disabled(self, db, user_id):
-        """Test retrieving backup codes when 2FA is disabled."""
-        codes = db.get_backup_codes(user_id)
-        assert codes == []
+    def test_get_backup_code_count_when_disabled(self, db, user_id):
+        """Test counting backup codes when 2FA is disabled."""
+        assert db.get_backup_code_count(user_id) == 0
+
+    def test_backup_codes_stored_hashed(self, db, user_id):
+        """Test backup codes are not stored in plain text."""
+        manager = TOTPManager()
+        backup_codes = manager.generate_backup_codes()
+        db.enable_2fa(user_id, manager.generate_secret(), backup_codes)
+
+        stored = [
+            row[0]
+            for row in db.conn.execute(
+                "SELECT code_hash FROM totp_backup_codes WHERE user_id = ?",
+                (user_id,),
+            )
+        ]
+        assert len(stored) == 10
+        assert not set(stored) & set(backup_codes)
 
     def test_use_backup_code(self, db, user_id):
         """Test using a backup code."""
@@ -314,10 +330,20 @@ class TestDatabaseTwoFactor:
         assert success
         assert "9 backup codes remaining" in message
 
-        # Verify code is removed
-        remaining_codes = db.get_backup_codes(user_id)
-        assert len(remaining_codes) == 9
-        assert code_to_use not in remaining_codes
+        # Verify code cannot be used again
+        assert db.get_backup_code_count(user_id) == 9
+        success, message = db.use_backup_code(user_id, code_to_use)
+        assert not success
+        assert "Invalid backup code" in message
+
+    def test_use_backup_code_normalizes_input(self, db, user_id):
+        """Test backup codes match regardless of case and dashes."""
+        manager = TOTPManager()
+        backup_codes = manager.generate_backup_codes()
+        db.enable_2fa(user_id, manager.generate_secret(), backup_codes)
+
+        success, _ = db.use_backup_code(user_id, backup_codes[0].replace("-", "").lower())
+        assert success
 
     def test_use_backup_code_all_codes(self, db, user_id):
         """Test using all backup codes."""
@@ -338,8 +364,7 @@ class TestDatabaseTwoFactor:
                 assert "0 backup codes remaining" in message
 
         # Verify all codes are used
-        remaining_codes = db.get_backup_codes(user_id)
-        assert len(remaining_codes) == 0
+        assert db.get_backup_code_count(user_id) == 0
 
     def test_use_invalid_backup_code(self, db, user_id):
         """Test using an invalid backup code."""
@@ -367,6 +392,50 @@ class TestDatabaseTwoFactor:
 
         assert success
 
+    def test_update_2fa_last_used_is_buffered(self, db, user_id):
+        """Test last used timestamps are written in batches."""
+        manager = TOTPManager()
+        secret = manager.generate_secret()
+        db.enable_2fa(user_id, secret, manager.generate_backup_codes())
+
+        assert db.update_2fa_last_used(user_id)
+        row = db.conn.execute(
+            "SELECT last_used FROM totp_secrets WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        assert row["last_used"] is None
+
+        # Reading the status writes pending timestamps first
+        assert db.get_2fa_status(user_id)["last_used"] is not None
+
+    def test_failed_last_used_flush_keeps_timestamps(self, db, user_id, monkeypatch):
+        """Test buffered timestamps survive a failed write for the next flush."""
+        manager = TOTPManager()
+        db.enable_2fa(user_id, manager.generate_secret(), [])
+        assert db.update_2fa_last_used(user_id)
+
+        monkeypatch.setattr(
+            db_manager, "UPDATE_2FA_LAST_USED_SQL", "UPDATE missing SET x = ?"
+        )
+        assert db.flush_2fa_last_used() is False
+        assert user_id in db._pending_last_used
+
+        monkeypatch.undo()
+        assert db.flush_2fa_last_used() is True
+        assert db.get_2fa_status(user_id)["last_used"] is not None
+
+    def test_last_used_not_flushed_inside_transaction(self, db, user_id):
+        """Test a rolled back transaction() does not lose buffered timestamps."""
+        manager = TOTPManager()
+        db.enable_2fa(user_id, manager.generate_secret(), [])
+        assert db.update_2fa_last_used(user_id)
+
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                assert db.flush_2fa_last_used() is True
+                raise RuntimeError("roll back")
+
+        assert user_id in db._pending_last_used
+
     def test_get_2fa_status(self, db, user_id):
         """Test getting comprehensive 2FA status."""
         manager = TOTPManager()
@@ -408,6 +477,42 @@ class TestDatabaseTwoFactor:
         assert "disabled successfully" in message.lower()
         assert not db.is_2fa_enabled(user_id)
 
+    def test_2fa_lookups_cached_until_write(self, db, user_id):
+        """Test the 2FA flag is cached and enable/disable invalidate it."""
+        manager = TOTPManager()
+        secret = manager.generate_secret()
+        db.enable_2fa(user_id, secret, manager.generate_backup_codes())
+
+        assert db.is_2fa_enabled(user_id)
+        assert db.get_2fa_secret(user_id) == secret
+
+        # The secret is never cached, so a change is seen straight away
+        db.conn.execute(
+            "UPDATE totp_secrets SET secret_key = 'OTHER' WHERE user_id = ?",
+            (user_id,),
+        )
+        assert db.get_2fa_secret(user_id) == "OTHER"
+
+        db.disable_2fa(user_id)
+        assert not db.is_2fa_enabled(user_id)
+        assert db.get_2fa_secret(user_id) is None
+
+    def test_2fa_change_seen_by_other_instance(self, temp_db):
+        """Test a cached "disabled" answer is dropped after another writer."""
+        user_id = temp_db.create_user("otheruser", "TestPass123!", "Other User")
+        other = DatabaseManager(temp_db.db_path)
+        try:
+            assert not other.is_2fa_enabled(user_id)
+
+            manager = TOTPManager()
+            secret = manager.generate_secret()
+            temp_db.enable_2fa(user_id, secret, manager.generate_backup_codes())
+
+            assert other.is_2fa_enabled(user_id)
+            assert other.get_2fa_secret(user_id) == secret
+        finally:
+            other.close()
+
     def test_disable_2fa_removes_data(self, db, user_id):
         """Test that disabling 2FA removes secret and backup codes."""
         manager = TOTPManager()
@@ -422,7 +527,7 @@ class TestDatabaseTwoFactor:
 
         # Verify data is removed
         assert db.get_2fa_secret(user_id) is None
-        assert db.get_backup_codes(user_id) == []
+        assert db.get_backup_code_count(user_id) == 0
         status = db.get_2fa_status(user_id)
         assert status is not None
         assert status["enabled"] is False
@@ -442,10 +547,22 @@ class TestDatabaseTwoFactor:
         assert success
         assert "new backup codes" in message.lower()
 
-        # Verify new codes are stored
-        retrieved_codes = db.get_backup_codes(user_id)
-        assert retrieved_codes == new_codes
-        assert retrieved_codes != old_codes
+        # Verify only the new codes are accepted
+        assert db.get_backup_code_count(user_id) == 10
+        assert not db.use_backup_code(user_id, old_codes[0])[0]
+        assert db.use_backup_code(user_id, new_codes[0])[0]
+
+    def test_regenerate_backup_codes_failure_keeps_old_codes(self, db, user_id):
+        """Test a failed regeneration rolls back the delete of old codes."""
+        manager = TOTPManager()
+        old_codes = manager.generate_backup_codes()
+        db.enable_2fa(user_id, manager.generate_secret(), old_codes)
+
+        success, _ = db.regenerate_backup_codes(user_id, ["ABCD-EFGH", None])
+
+        assert not success
+        assert db.get_backup_code_count(user_id) == 10
+        assert db.use_backup_code(user_id, old_codes[0])[0]
 
     def test_enable_2fa_twice(self, db, user_id):
         """Test enabling 2FA twice (should update, not fail)."""
@@ -467,6 +584,40 @@ class TestDatabaseTwoFactor:
         retrieved_secret = db.get_2fa_secret(user_id)
         assert retrieved_secret == secret2
 
+    def test_migrates_json_backup_codes(self, tmp_path):
+        """Test JSON backup code lists are moved into the hashed code table."""
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE totp_secrets (
+                totp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER UNIQUE NOT NULL,
+                secret_key TEXT NOT NULL,
+                backup_codes TEXT,
+                enabled INTEGER DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                last_used TEXT
+            );
+            """
+        )
+        conn.execute(
+            "INSERT INTO totp_secrets (user_id, secret_key, backup_codes, enabled) "
+            "VALUES (1, 'SECRET', ?, 1)",
+            (json.dumps(["AAAA-1111", "BBBB-2222"]),),
+        )
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(path)
+        try:
+            columns = [row[1] for row in db.conn.execute("PRAGMA table_info(totp_secrets)")]
+            assert "backup_codes" not in columns
+            assert db.get_backup_code_count(1) == 2
+            assert db.use_backup_code(1, "bbbb-2222")[0]
+        finally:
+            db.close()
+
 
 class TestTwoFactorIntegration:
     """Test full 2FA workflow integration."""
@@ -518,8 +669,8 @@ class TestTwoFactorIntegration:
         # 7. Verify secret can be retrieved
         assert db.get_2fa_secret(user_id) == secret
 
-        # 8. Verify backup codes can be retrieved
-        assert db.get_backup_codes(user_id) == backup_codes
+        # 8. Verify backup codes were stored
+        assert db.get_backup_code_count(user_id) == len(backup_codes)
 
     def test_full_2fa_login_workflow(self, db, user_id):
         """Test complete 2FA login workflow."""
@@ -558,24 +709,19 @@ class TestTwoFactorIntegration:
         db.enable_2fa(user_id, secret, backup_codes)
 
         # Simulate login with backup code:
-        # 1. Get backup codes from database
-        stored_codes = db.get_backup_codes(user_id)
+        # 1. Check backup codes are available
+        assert db.get_backup_code_count(user_id) == 10
 
         # 2. User enters backup code
-        user_backup_code = stored_codes[0]
-
-        # 3. Verify backup code
-        is_valid, used_code = manager.verify_backup_code(user_backup_code, stored_codes)
-        assert is_valid
+        user_backup_code = backup_codes[0]
 
-        # 4. Mark code as used in database
-        success, message = db.use_backup_code(user_id, used_code)
+        # 3. Verify backup code and mark it as used in database
+        success, message = db.use_backup_code(user_id, user_backup_code)
         assert success
 
-        # 5. Verify code is removed
-        remaining_codes = db.get_backup_codes(user_id)
-        assert len(remaining_codes) == 9
-        assert used_code not in remaining_codes
+        # 4. Verify code is consumed
+        assert db.get_backup_code_count(user_id) == 9
+        assert not db.use_backup_code(user_id, user_backup_code)[0]
 
     def test_full_2fa_disable_workflow(self, db, user_id):
         """Test complete 2FA disable workflow."""
@@ -598,7 +744,7 @@ class TestTwoFactorIntegration:
 
         # Verify all data is removed
         assert db.get_2fa_secret(user_id) is None
-        assert db.get_backup_codes(user_id) == []
+        assert db.get_backup_code_count(user_id) == 0
         status = db.get_2fa_status(user_id)
         assert status is not None
         assert status["enabled"] is False
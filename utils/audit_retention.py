@@ -76,9 +76,10 @@ class AuditRetentionPolicy:
 
         if keep_critical:
             # Get all old logs that are NOT critical
-            all_logs = self.db.search_audit_logs(filters, limit=100000)
             return [
-                log for log in all_logs if log.get("severity") != self.CRITICAL_SEVERITY
+                log
+                for log in self.db.iter_audit_logs(filters)
+                if log.get("severity") != self.CRITICAL_SEVERITY
             ]
         else:
             # Get all old logs
@@ -186,24 +187,19 @@ class AuditRetentionPolicy:
             cutoff_date = (
                 datetime.now() - timedelta(days=self.retention_days)
             ).isoformat()
-            within_retention = self.db.search_audit_logs(
-                filters={"start_date": cutoff_date}, limit=100000
+            stats["within_retention"] = self.db.get_audit_log_count(
+                {"start_date": cutoff_date}
             )
-            stats["within_retention"] = len(within_retention)
 
             # Get logs beyond retention period
-            beyond_retention = self.db.search_audit_logs(
-                filters={"end_date": cutoff_date}, limit=100000
+            stats["beyond_retention"] = self.db.get_audit_log_count(
+                {"end_date": cutoff_date}
             )
-            stats["beyond_retention"] = len(beyond_retention)
 
             # Critical logs beyond retention
-            critical_beyond = [
-                log
-                for log in beyond_retention
-                if log.get("severity") == self.CRITICAL_SEVERITY
-            ]
-            stats["critical_beyond_retention"] = len(critical_beyond)
+            stats["critical_beyond_retention"] = self.db.get_audit_log_count(
+                {"end_date": cutoff_date, "severity": self.CRITICAL_SEVERITY}
+            )
 
             # Cleanup candidates (non-critical beyond retention)
             stats["cleanup_candidates"] = (